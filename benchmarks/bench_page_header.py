@@ -0,0 +1,125 @@
+"""
+页眉解析微基准：比较拆分PDF时每页重新构建并逐个查找8个正则（旧方法）
+与 split_pdf_header.parse_page_header 使用预编译正则（新方法）的耗时，并校验两者结果一致
+
+用法：
+    python benchmarks/bench_page_header.py [--pages 5000] [--repeat 5] [--pdf 文件1.pdf 文件2.pdf ...]
+
+不指定 --pdf 时使用生成的收货单页面文本；指定时从PDF中提取页面文本作为样本
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from split_pdf_header import parse_page_header
+
+VENDORS = ['海南鲜丰食品有限公司', '海口明珠贸易商行', '椰城酒水批发部', '琼州粮油有限公司']
+VENDOR_LABELS = ['供应商/Vendor：', '供应商Vendor:', '供应商名称：', 'VENDOR:']
+
+
+def legacy_parse(text):
+    """拆分PDF原来的页面解析方式：每页重新构建供应商正则列表，逐个查找"""
+    # 提取收货单号
+    receipt_match = re.search(r'收货单号\s*RF:\s*(RFAH7970\d+)', text)
+    new_receipt = receipt_match.group(1) if receipt_match else None
+
+    # 提取收货日期
+    rev_date_match = re.search(r'收货日期\s*Rev\. Date:\s*(\d{4}-\d{2}-\d{2})', text)
+    new_rev_date = rev_date_match.group(1) if rev_date_match else None
+
+    # 使用多个正则表达式模式查找供应商信息
+    patterns = [
+        r'供应商[/\\]?Vendor[：:](.*?)\n',
+        r'供应商[/\\]?Vendor[：:](.*?)\s',
+        r'供应商名称[：:](.*?)\n',
+        r'供应商名称[：:](.*?)\s',
+        r'VENDOR[：:](.*?)\n',
+        r'VENDOR[：:](.*?)\s'
+    ]
+
+    new_vendor = None
+    for pattern in patterns:
+        vendor_match = re.search(pattern, text, re.IGNORECASE)
+        if vendor_match:
+            vendor = vendor_match.group(1).strip()
+            if vendor:
+                new_vendor = vendor
+                break
+
+    return new_receipt, new_vendor, new_rev_date
+
+
+def generate_pages(count, seed=0):
+    """生成收货单页面文本：页眉包含收货单号、收货日期和供应商，部分为没有页眉的续页"""
+    rnd = random.Random(seed)
+    pages = []
+    for index in range(count):
+        lines = ['海口索菲特大酒店 收货单 Receiving Report']
+        if rnd.random() < 0.85:
+            lines.append(f'收货单号 RF: RFAH7970{index:06d}')
+            lines.append(f'收货日期 Rev. Date: 2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}')
+            lines.append(f'{rnd.choice(VENDOR_LABELS)}{rnd.choice(VENDORS)}')
+        lines.append('部门 Dept: 中厨房  订单号 PO: PO2025' + str(rnd.randint(10000, 99999)))
+        for _ in range(rnd.randint(15, 30)):
+            lines.append(f'{rnd.randint(100000, 999999)} 商品{rnd.randint(1, 999)} 公斤 {rnd.randint(1, 50)} '
+                         f'{rnd.randint(1, 500)}.00 {rnd.randint(1, 9999)}.00')
+        lines.append(f'合计 Total: {rnd.randint(1000, 99999)}.00  收货人 Received By: 张三')
+        pages.append('\n'.join(lines) + '\n')
+    return pages
+
+
+def extract_pdf_pages(paths):
+    """从PDF文件中提取所有页面文本"""
+    import PyPDF2
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            pages.extend(page.extract_text() for page in reader.pages)
+    return pages
+
+
+def best_time(func, pages, repeat):
+    """重复多次解析全部页面，返回最短耗时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in pages:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页眉解析微基准')
+    parser.add_argument('--pages', type=int, default=5000, help='生成的页面数')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数，取最短耗时')
+    parser.add_argument('--pdf', nargs='+', help='从这些PDF文件中提取页面文本作为样本')
+    args = parser.parse_args()
+
+    pages = extract_pdf_pages(args.pdf) if args.pdf else generate_pages(args.pages)
+
+    # 两种方法的结果必须完全一致
+    mismatches = [text for text in pages if legacy_parse(text) != parse_page_header(text)]
+    if mismatches:
+        print(f'结果不一致的页面: {len(mismatches)}')
+        print(repr(mismatches[0][:500]))
+        return 1
+
+    legacy_time = best_time(legacy_parse, pages, args.repeat)
+    new_time = best_time(parse_page_header, pages, args.repeat)
+    print(f'页面数: {len(pages)}')
+    print(f'逐个构建查找: {legacy_time * 1e6 / len(pages):.1f} 微秒/页')
+    print(f'预编译查找:   {new_time * 1e6 / len(pages):.1f} 微秒/页')
+    print(f'加速: {legacy_time / new_time:.1f} 倍')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+解析结果缓存基准：比较流式处理时逐行解析对账单与读取解析结果缓存（Parquet，见srct_sidecar.py）的耗时，
+两种方式生成的汇总结果应完全一致
+
+用法：
+    python benchmarks/bench_sidecar.py [--rows 60000] [--statement 文件1.xlsx 文件2.xlsx ...] [--repeat 3]
+
+不指定 --statement 时使用生成的合成对账单（见fixtures.py）。需要pyarrow；
+缓存由正常处理（写入品类标记列和确认函sheet）后保存，保存耗时单独列出
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import StageTimer, format_case
+from fixtures import ensure_fixture
+from srct_classifier import ClassificationCache, classify_series
+from srct_pipeline import CLASSIFICATION_COLUMN
+from srct_sidecar import load_sidecar, save_sidecar
+from srct_streaming import stream_statement
+from srct_workbook import load_statement
+
+
+def stream_case(path, cache, timer):
+    """逐行解析对账单并汇总"""
+    summary, group_rows, rows, source_wb = timer.run('stream_read', stream_statement, path, cache,
+                                                     lambda message: None)
+    source_wb.close()
+    return summary, group_rows
+
+
+def sidecar_case(path, cache, timer):
+    """读取解析结果缓存并汇总"""
+    sidecar = timer.run('read_sidecar', load_sidecar, path)
+    summary, group_rows, rows, source_wb = timer.run('aggregate', sidecar.summarize, cache)
+    return summary, group_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='解析结果缓存基准')
+    parser.add_argument('--rows', type=int, default=60000, help='生成的合成对账单行数')
+    parser.add_argument('--statement', nargs='+', help='使用指定的对账单代替合成数据')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，每个阶段取最短耗时')
+    args = parser.parse_args()
+
+    fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+    sources = args.statement or [ensure_fixture(fixture_dir, 'statement', args.rows)]
+    cache = ClassificationCache()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for source in sources:
+            # 缓存保存在对账单所在文件夹中，复制到临时文件夹后处理
+            path = shutil.copy(source, work_dir)
+            df, wb = load_statement(path)
+            df.insert(13, CLASSIFICATION_COLUMN, classify_series(df[df.columns[12]], cache=cache))
+            saved = StageTimer()
+            if not saved.run('save_sidecar', save_sidecar, path, df, df.columns[12], df[CLASSIFICATION_COLUMN],
+                             cache.rule_set.version, wb, lambda message: None):
+                print(f'{source}: 无法保存解析结果缓存（需要pyarrow，金额列需为数字）')
+                return 1
+
+            stream, sidecar = StageTimer(), StageTimer()
+            for _ in range(max(1, args.repeat)):
+                expected = stream_case(path, cache, stream)
+                actual = sidecar_case(path, cache, sidecar)
+            same = expected[0].equals(actual[0]) and expected[1].equals(actual[1])
+            print(f'{source}: {len(df)} 行，汇总结果{"一致" if same else "不一致"}')
+            print(format_case('  逐行解析', stream.stages))
+            print(format_case('  读取缓存', sidecar.stages))
+            print(format_case('  保存缓存（正常处理时）', saved.stages))
+            print(f'  {sum(stream.stages.values()) / sum(sidecar.stages.values()):.1f} 倍')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
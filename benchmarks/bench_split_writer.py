@@ -0,0 +1,116 @@
+"""
+收货单PDF生成基准：比较每个收货单新建一个PyPDF2.PdfWriter（旧方法）
+与 split_pdf_writer.ReceiptPdfWriter 按原样复制对象（新方法）的耗时和输出大小，并校验输出的页数和页面文本
+
+用法：
+    python benchmarks/bench_split_writer.py [--pages 1000] [--pdf 文件1.pdf 文件2.pdf ...] [--repeat 3] [--no-verify]
+
+不指定 --pdf 时使用生成的合成收货单PDF（见fixtures.py）。只计算生成PDF内容的时间，不包括写入磁盘
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyPDF2
+
+from fixtures import ensure_fixture
+from split_pdf_batch import segment_pdf
+from split_pdf_writer import ReceiptPdfWriter
+
+
+def legacy_render(data, receipts):
+    """拆分PDF原来的保存方式：每个收货单新建PdfWriter并逐页add_page"""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    outputs = []
+    for page_nums in receipts:
+        writer = PyPDF2.PdfWriter()
+        for page_num in page_nums:
+            writer.add_page(reader.pages[page_num])
+        output = io.BytesIO()
+        writer.write(output)
+        outputs.append(output.getvalue())
+    return outputs
+
+
+def copy_render(data, receipts):
+    """同一个源文件的所有收货单由一个ReceiptPdfWriter生成"""
+    writer = ReceiptPdfWriter(data)
+    outputs = [writer.render(page_nums) for page_nums in receipts]
+    return outputs, writer.fallbacks
+
+
+def best_time(func, repeat):
+    """重复多次，返回最短耗时（秒）和最后一次的结果"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def verify(data, receipts, outputs):
+    """输出文件可以按严格模式读取，页数和每页文本与源文件一致，返回不一致的收货单数量"""
+    source = PyPDF2.PdfReader(io.BytesIO(data))
+    mismatches = 0
+    for page_nums, content in zip(receipts, outputs):
+        reader = PyPDF2.PdfReader(io.BytesIO(content), strict=True)
+        texts = [page.extract_text() for page in reader.pages]
+        if texts != [source.pages[page_num].extract_text() for page_num in page_nums]:
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='收货单PDF生成基准')
+    parser.add_argument('--pages', type=int, default=1000, help='生成的合成PDF页数')
+    parser.add_argument('--pdf', nargs='+', help='要拆分的PDF文件')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最短耗时')
+    parser.add_argument('--no-verify', action='store_true', help='不校验输出的页面文本')
+    args = parser.parse_args()
+
+    totals = {'receipts': 0, 'legacy_time': 0.0, 'copy_time': 0.0, 'legacy_bytes': 0, 'copy_bytes': 0}
+    fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+    pdf_paths = args.pdf or [ensure_fixture(fixture_dir, 'pdf', args.pages)]
+    for path in pdf_paths:
+        with open(path, 'rb') as file:
+            data = file.read()
+        receipts = [page_nums for _, _, _, page_nums in segment_pdf(path)['receipts']]
+        if not receipts:
+            print(f'{path}: 没有找到收货单')
+            continue
+
+        legacy_time, legacy_outputs = best_time(lambda: legacy_render(data, receipts), args.repeat)
+        copy_time, (copy_outputs, fallbacks) = best_time(lambda: copy_render(data, receipts), args.repeat)
+        if not args.no_verify:
+            mismatches = verify(data, receipts, copy_outputs)
+            if mismatches:
+                print(f'{path}: {mismatches} 个收货单的页面文本与源文件不一致')
+                return 1
+
+        print(f'{path}: {len(receipts)} 个收货单，源文件 {len(data) / 1024:.1f} KB，'
+              f'{fallbacks} 个收货单改用PdfWriter生成')
+        totals['receipts'] += len(receipts)
+        totals['legacy_time'] += legacy_time
+        totals['copy_time'] += copy_time
+        totals['legacy_bytes'] += sum(map(len, legacy_outputs))
+        totals['copy_bytes'] += sum(map(len, copy_outputs))
+
+    count = totals['receipts']
+    if not count:
+        return 1
+    print(f'每个收货单新建PdfWriter: {totals["legacy_time"] * 1000 / count:.2f} 毫秒/个，'
+          f'平均 {totals["legacy_bytes"] / count / 1024:.1f} KB')
+    print(f'按原样复制对象:         {totals["copy_time"] * 1000 / count:.2f} 毫秒/个，'
+          f'平均 {totals["copy_bytes"] / count / 1024:.1f} KB')
+    print(f'加速: {totals["legacy_time"] / totals["copy_time"]:.1f} 倍')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+启动时间基准：在新的Python进程中启动SRCT界面，测量从启动进程到窗口显示（time-to-window）
+和到处理完第一个对账单（time-to-first-file）的时间，可与指定的git版本比较
+
+用法：
+    python benchmarks/bench_startup.py [--compare HEAD~1] [--rows 1000] [--repeat 5] [--statement 文件.xlsx]
+
+--compare 将指定的git版本（提交、分支或标签）导出到临时文件夹，用同样的方法测量。
+窗口显示后立即通过界面的处理方法（ProductClassificationApp.process_file）处理对账单，
+不等待后台预先导入，即第一次处理时最长的等待时间；没有srct_pipeline等模块的早期版本同样可以测量。
+每次测量使用新进程，取中位数；测量的是源码运行，打包的onefile程序启动时的解压时间不包括在内。
+需要图形界面（Windows或设置了DISPLAY的环境）；测量时跳过到期检查
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+from fixtures import ensure_fixture
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, 'fixtures')
+
+# 在子进程中运行：参数为源码目录、对账单路径和父进程启动子进程的时间（time.time()）
+DRIVER = r'''
+import json, os, sys, time
+source_dir, statement, started = sys.argv[1], sys.argv[2], float(sys.argv[3])
+os.chdir(source_dir)
+sys.path.insert(0, source_dir)
+import SRCT
+SRCT.ProductClassificationApp.check_expiration = lambda self: True
+root = SRCT.Tk()
+app = SRCT.ProductClassificationApp(root)
+root.update()
+window = time.time() - started
+# 与点击开始处理时一样记录界面选项（较早的版本在处理时直接读取界面控件，不需要这些属性）
+for name in ("edit_in_place", "streaming", "profile", "consolidate", "force", "sidecar"):
+    variable = getattr(app, name + "_var", None)
+    setattr(app, name, variable.get() if variable is not None else False)
+# 通过界面的处理方法处理对账单，各版本都有process_file；按批处理方式调用，不弹出消息框
+success = app.process_file(statement, is_batch=True)
+root.update()
+first_file = time.time() - started
+root.destroy()
+print(json.dumps({"window": window, "first_file": first_file, "success": bool(success)}))
+'''
+
+
+def export_revision(revision, target_dir):
+    """将git版本的文件导出到target_dir"""
+    archive = subprocess.run(['git', '-C', REPO_DIR, 'archive', '--format=tar', revision],
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target_dir)
+
+
+def measure_once(source_dir, statement):
+    """启动一次界面并处理对账单，返回 {'window', 'first_file', 'success'}（秒）"""
+    started = time.time()
+    completed = subprocess.run([sys.executable, '-c', DRIVER, source_dir, statement, repr(started)],
+                               capture_output=True, text=True, encoding='utf-8')
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f'退出码 {completed.returncode}')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(name, source_dir, statement, repeat):
+    """重复测量，返回两个时间的中位数"""
+    runs = [measure_once(source_dir, statement) for _ in range(repeat)]
+    if not all(run['success'] for run in runs):
+        raise RuntimeError(f'{name}: 对账单处理失败')
+    window = statistics.median(run['window'] for run in runs)
+    first_file = statistics.median(run['first_file'] for run in runs)
+    print(f'{name}: 窗口显示 {window:.3f}s，处理完第一个文件 {first_file:.3f}s')
+    return window, first_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SRCT界面启动时间基准')
+    parser.add_argument('--compare', metavar='REVISION', help='与之比较的git版本，如HEAD~1')
+    parser.add_argument('--rows', type=int, default=1000, help='生成的合成对账单行数')
+    parser.add_argument('--statement', help='使用指定的对账单代替合成数据')
+    parser.add_argument('--repeat', type=int, default=5, help='每个版本的测量次数，取中位数')
+    args = parser.parse_args()
+
+    source = args.statement or ensure_fixture(FIXTURE_DIR, 'statement', args.rows)
+    with tempfile.TemporaryDirectory() as work_dir:
+        # 处理结果写在临时文件夹中，不影响原文件
+        statement = os.path.join(work_dir, os.path.basename(source))
+        shutil.copy(source, statement)
+
+        try:
+            current = measure('当前代码', REPO_DIR, statement, max(1, args.repeat))
+            if not args.compare:
+                return 0
+            baseline_dir = os.path.join(work_dir, 'baseline')
+            export_revision(args.compare, baseline_dir)
+            baseline = measure(args.compare, baseline_dir, statement, max(1, args.repeat))
+        except (RuntimeError, subprocess.CalledProcessError) as e:
+            print(f'测量失败: {e}')
+            return 1
+
+    for label, base_seconds, seconds in (('窗口显示', baseline[0], current[0]),
+                                         ('处理完第一个文件', baseline[1], current[1])):
+        print(f'{label}: {args.compare} {base_seconds:.3f}s，当前代码 {seconds:.3f}s（{base_seconds / seconds:.2f} 倍）')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
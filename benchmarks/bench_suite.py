@@ -0,0 +1,188 @@
+"""
+基准测试套件：用合成数据分阶段计时对账单处理和收货单PDF拆分，保存JSON结果并与基准结果比较
+
+用法：
+    python benchmarks/bench_suite.py [--rows 1000 10000 100000] [--pages 10 100 1000] [--repeat 1]
+                                     [--output 结果.json] [--baseline benchmarks/baseline.json]
+                                     [--save-baseline] [--tolerance 0.2]
+
+对账单阶段：read（load_statement读取）、classify（M列分类）、aggregate（品类汇总）、
+write_sheet（写入品类标记列和确认函sheet）、save（保存工作簿）。
+PDF阶段：extract（读取PDF、提取并解析页面文本、拆分收货单，不使用页面文本缓存）、
+split（保存各收货单PDF）。
+合成数据生成在 benchmarks/fixtures/ 中，同样的参数只生成一次。
+指定 --baseline 时与基准结果比较，某阶段耗时超过基准的 (1 + tolerance) 倍且多出0.05秒以上视为变慢，退出码为1；
+--save-baseline 将本次结果保存为基准结果
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import openpyxl
+import pandas as pd
+import PyPDF2
+
+from fixtures import ensure_fixture
+from split_pdf_batch import segment_pdf, write_receipts
+from srct_classifier import ClassificationCache, classify_series
+from srct_pipeline import CLASSIFICATION_COLUMN
+from srct_sheet import write_confirmation_sheet
+from srct_summary import summarize_by_category
+from srct_workbook import HEADER_ROW, load_statement, write_column
+
+FIXTURE_DIR = os.path.join(BENCHMARK_DIR, 'fixtures')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# 比较时忽略小于该秒数的变化，避免很短的阶段因计时波动被判为变慢
+MIN_REGRESSION_SECONDS = 0.05
+
+
+class StageTimer:
+    """记录各阶段的耗时，重复运行时每个阶段取最短耗时"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        self.stages[stage] = min(self.stages.get(stage, elapsed), elapsed)
+        return result
+
+    def rounded(self):
+        return {stage: round(seconds, 4) for stage, seconds in self.stages.items()}
+
+
+def bench_statement(path, output_dir, timer):
+    """按对账单处理流程的各阶段计时一次"""
+    df, wb = timer.run('read', load_statement, path)
+    m_column = df.columns[12]
+    labels = timer.run('classify', classify_series, df[m_column], None, ClassificationCache())
+    df.insert(13, CLASSIFICATION_COLUMN, labels)
+    summary, _ = timer.run('aggregate', summarize_by_category, df, CLASSIFICATION_COLUMN)
+
+    def write_sheet():
+        ws = wb.active
+        ws.cell(row=HEADER_ROW, column=14, value=CLASSIFICATION_COLUMN)
+        write_column(ws, 14, HEADER_ROW + 1, df[CLASSIFICATION_COLUMN].tolist())
+        write_confirmation_sheet(wb, summary, path, log=lambda message: None)
+
+    timer.run('write_sheet', write_sheet)
+    timer.run('save', wb.save, os.path.join(output_dir, os.path.basename(path)))
+    return len(df)
+
+
+def bench_pdf(path, output_dir, timer):
+    """按拆分PDF流程的各阶段计时一次"""
+    segment = timer.run('extract', segment_pdf, path)
+    split_dir = os.path.join(output_dir, 'split')
+    shutil.rmtree(split_dir, ignore_errors=True)
+    timer.run('split', write_receipts, path, segment['receipts'], split_dir)
+    return len(segment['receipts'])
+
+
+def run_suite(rows_list, pages_list, repeat, log=print):
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for rows in rows_list:
+            path = ensure_fixture(FIXTURE_DIR, 'statement', rows, log=log)
+            timer = StageTimer()
+            for _ in range(repeat):
+                bench_statement(path, output_dir, timer)
+            results[f'statement_{rows}'] = {'rows': rows, 'stages': timer.rounded()}
+            log(format_case(f'statement_{rows}', timer.stages))
+
+        for pages in pages_list:
+            path = ensure_fixture(FIXTURE_DIR, 'pdf', pages, log=log)
+            timer = StageTimer()
+            for _ in range(repeat):
+                receipts = bench_pdf(path, output_dir, timer)
+            results[f'pdf_{pages}'] = {'pages': pages, 'receipts': receipts, 'stages': timer.rounded()}
+            log(format_case(f'pdf_{pages}', timer.stages))
+    return results
+
+
+def format_case(name, stages):
+    parts = ', '.join(f'{stage} {seconds:.3f}s' for stage, seconds in stages.items())
+    return f'{name}: {parts}, 合计 {sum(stages.values()):.3f}s'
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'openpyxl': openpyxl.__version__,
+        'PyPDF2': PyPDF2.__version__,
+    }
+
+
+def compare(results, baseline, tolerance, log=print):
+    """与基准结果逐阶段比较，返回变慢的 [(用例, 阶段, 基准秒数, 本次秒数)]"""
+    regressions = []
+    for name, case in results.items():
+        base_case = baseline.get('results', {}).get(name)
+        if not base_case:
+            log(f'{name}: 基准结果中没有该用例')
+            continue
+        for stage, seconds in case['stages'].items():
+            base_seconds = base_case['stages'].get(stage)
+            if base_seconds is None:
+                continue
+            ratio = seconds / base_seconds if base_seconds else float('inf')
+            slower = seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_REGRESSION_SECONDS
+            mark = '  变慢' if slower else ''
+            log(f'{name} {stage}: 基准 {base_seconds:.3f}s，本次 {seconds:.3f}s（{ratio:.2f} 倍）{mark}')
+            if slower:
+                regressions.append((name, stage, base_seconds, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对账单处理和收货单PDF拆分的分阶段基准测试')
+    parser.add_argument('--rows', type=int, nargs='*', default=[1000, 10000, 100000],
+                        help='对账单明细行数（可到1000000）')
+    parser.add_argument('--pages', type=int, nargs='*', default=[10, 100, 1000], help='收货单PDF页数（可到5000）')
+    parser.add_argument('--repeat', type=int, default=1, help='重复次数，每个阶段取最短耗时')
+    parser.add_argument('--output', help='保存本次结果的JSON文件')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基准结果JSON文件')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果保存为基准结果')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许比基准慢的比例')
+    args = parser.parse_args()
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': run_suite(args.rows, args.pages, max(1, args.repeat)),
+    }
+
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'结果已保存到: {path}')
+
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f'\n与基准结果比较（{args.baseline}，{baseline.get("created", "")}）')
+    regressions = compare(report['results'], baseline, args.tolerance)
+    if regressions:
+        print(f'\n{len(regressions)} 个阶段比基准慢 {args.tolerance:.0%} 以上')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+.xls对账单处理基准：比较原来的处理方式（openpyxl无法打开.xls，用pandas按值读取后只保存明细数据，
+不含标题行、格式和确认函sheet）与现在由xlrd读取一次并转换为openpyxl工作簿（保存为.xlsx，含确认函sheet）的各阶段耗时
+
+用法：
+    python benchmarks/bench_xls.py [--rows 60000] [--xls 文件1.xls 文件2.xls ...] [--repeat 1]
+
+不指定 --xls 时使用生成的合成.xls对账单（见fixtures.py，需要xlwt）。
+各阶段与 bench_suite.py 相同：read、classify、aggregate、write_sheet、save
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+import pandas as pd
+
+from bench_suite import StageTimer, format_case
+from fixtures import ensure_fixture
+from srct_classifier import ClassificationCache, classify_series
+from srct_pipeline import CLASSIFICATION_COLUMN, get_output_file
+from srct_sheet import write_confirmation_sheet
+from srct_summary import summarize_by_category
+from srct_workbook import HEADER_ROW, load_statement, write_column
+
+
+def legacy_process(path, output_file, cache, timer):
+    """原来处理.xls的方式：pandas按值读取，分类汇总后用ExcelWriter只保存明细数据"""
+    df = timer.run('read', lambda: pd.read_excel(path, header=HEADER_ROW - 1))
+    labels = timer.run('classify', classify_series, df[df.columns[12]], None, cache)
+    df.insert(13, CLASSIFICATION_COLUMN, labels)
+    timer.run('aggregate', summarize_by_category, df, CLASSIFICATION_COLUMN, cache.rule_set.categories)
+
+    def save():
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False)
+
+    timer.run('save', save)
+
+
+def native_process(path, output_file, cache, timer):
+    """现在的处理方式：xlrd读取一次，生成DataFrame和openpyxl工作簿，写入品类标记列和确认函sheet后保存为.xlsx"""
+    df, wb = timer.run('read', load_statement, path)
+    labels = timer.run('classify', classify_series, df[df.columns[12]], None, cache)
+    df.insert(13, CLASSIFICATION_COLUMN, labels)
+    summary, _ = timer.run('aggregate', summarize_by_category, df, CLASSIFICATION_COLUMN, cache.rule_set.categories)
+
+    def write_sheet():
+        ws = wb.active
+        ws.cell(row=HEADER_ROW, column=14, value=CLASSIFICATION_COLUMN)
+        write_column(ws, 14, HEADER_ROW + 1, df[CLASSIFICATION_COLUMN].tolist())
+        write_confirmation_sheet(wb, summary, path, log=lambda message: None)
+
+    timer.run('write_sheet', write_sheet)
+    timer.run('save', wb.save, output_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='.xls对账单处理基准')
+    parser.add_argument('--rows', type=int, default=60000, help='生成的合成.xls对账单行数（最多65530）')
+    parser.add_argument('--xls', nargs='+', help='要处理的.xls对账单')
+    parser.add_argument('--repeat', type=int, default=1, help='重复次数，每个阶段取最短耗时')
+    args = parser.parse_args()
+
+    fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+    xls_paths = args.xls or [ensure_fixture(fixture_dir, 'xls', args.rows)]
+    cache = ClassificationCache()
+    with tempfile.TemporaryDirectory() as output_dir:
+        for path in xls_paths:
+            legacy, native = StageTimer(), StageTimer()
+            output_file = os.path.join(output_dir, os.path.basename(get_output_file(path)))
+            for _ in range(max(1, args.repeat)):
+                legacy_process(path, os.path.join(output_dir, 'legacy.xlsx'), cache, legacy)
+                native_process(path, output_file, cache, native)
+
+            wb = openpyxl.load_workbook(output_file, read_only=True)
+            sheets = '、'.join(wb.sheetnames)
+            wb.close()
+            print(f'{path}: 输出 {os.path.basename(output_file)}（{sheets}）')
+            print(format_case('  原来的方式（只保存明细数据）', legacy.stages))
+            print(format_case('  xlrd读取并转换', native.stages))
+            legacy_total, native_total = sum(legacy.stages.values()), sum(native.stages.values())
+            print(f'  读取: {legacy.stages["read"] / native.stages["read"]:.2f} 倍，'
+                  f'合计: {legacy_total / native_total:.2f} 倍')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
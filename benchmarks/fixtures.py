@@ -0,0 +1,261 @@
+"""
+基准测试用的合成数据：供应商对账单(.xlsx)和RFAH7970格式的多收货单PDF，不包含任何真实数据
+
+用法：
+    python benchmarks/fixtures.py statement 输出.xlsx --rows 100000 [--seed 0]
+    python benchmarks/fixtures.py xls 输出.xls --rows 60000 [--seed 0]
+    python benchmarks/fixtures.py pdf 输出.pdf --pages 1000 [--seed 0] [--start 1]
+
+对账单：Statement Sheet，A1为年月标题，第6行为表头，L列为供应商名称（L7即供应商），
+M列为商品分类，包含部门、小计金额(结算)、税额(结算)列。.xls格式的对账单内容相同，需要xlwt，最多65530行。
+PDF：每页的文本使用带ToUnicode映射的CID字体写入，可以用PyPDF2提取出收货单号、收货日期和供应商
+"""
+import argparse
+import os
+import random
+import zlib
+
+VENDORS = ['海南鲜丰食品有限公司', '海口明珠贸易商行', '椰城酒水批发部', '琼州粮油有限公司']
+VENDOR_LABELS = ['供应商/Vendor：', '供应商/Vendor：', '供应商/Vendor：', '供应商名称：', 'VENDOR:']
+DEPARTMENTS = ['员工餐厅', '员工食堂', '中餐厅', '西餐厅', '大堂吧', '宴会厨房']
+
+# M列的商品分类取值，覆盖各品类的关键词、未匹配的取值和空值
+M_VALUES = [
+    '鱼虾蟹干及瑶柱干', '海参鲍鱼鱼翅干及肚干', '其他水产干货', '燕窝类', '活鲜海产', '冻品海鲜',
+    '红酒', '白酒', '啤酒', '饮料类', '果汁', '水', '矿泉水', '蔬菜', '肉类', '调料', '粮油', None,
+]
+
+STATEMENT_HEADER = ['序号', '收货日期', '收货单号', '部门', '商品编码', '商品名称', '单位', '数量', '单价',
+                    '小计金额(结算)', '税额(结算)', '供应商名称', '商品分类']
+
+
+# .xls格式每个工作表最多65536行，减去表头前的行
+MAX_XLS_ROWS = 65530
+
+
+def statement_title_rows(year_month):
+    """表头之前的标题行（第1至5行）"""
+    return [[f'{year_month} 供应商对账单 Supplier Statement'], ['海口索菲特大酒店'], [f'对账期间: {year_month}'], [], []]
+
+
+def statement_rows(rows, seed=0, year_month='2025-06'):
+    """逐行生成明细数据，同样的参数生成的内容相同"""
+    rnd = random.Random(seed)
+    supplier = rnd.choice(VENDORS)
+    for index in range(rows):
+        quantity = rnd.randint(1, 50)
+        price = round(rnd.uniform(1, 500), 2)
+        untaxed = round(quantity * price, 2)
+        yield [
+            index + 1,
+            f'{year_month}-{rnd.randint(1, 28):02d}',
+            f'RFAH7970{rnd.randint(0, 999999):06d}',
+            rnd.choice(DEPARTMENTS),
+            f'C{rnd.randint(100000, 999999)}',
+            f'商品{rnd.randint(1, 2000)}',
+            rnd.choice(['公斤', '箱', '瓶', '件']),
+            quantity,
+            price,
+            untaxed,
+            round(untaxed * 0.09, 2),
+            supplier,
+            rnd.choice(M_VALUES),
+        ]
+
+
+def write_statement_xlsx(path, rows, seed=0, year_month='2025-06'):
+    """生成有rows行明细的对账单，使用只写模式逐行写入，百万行也不会占用大量内存"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Statement Sheet')
+    for values in statement_title_rows(year_month):
+        ws.append(values)
+
+    header = []
+    for title in STATEMENT_HEADER:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = Font(bold=True)
+        cell.fill = PatternFill('solid', start_color='FFFF00')
+        header.append(cell)
+    ws.append(header)
+
+    for values in statement_rows(rows, seed, year_month):
+        ws.append(values)
+    wb.save(path)
+
+
+def write_statement_xls(path, rows, seed=0, year_month='2025-06'):
+    """生成内容与write_statement_xlsx相同的旧版.xls对账单"""
+    import xlwt
+
+    if rows > MAX_XLS_ROWS:
+        raise ValueError(f'.xls格式的对账单最多{MAX_XLS_ROWS}行')
+    book = xlwt.Workbook(encoding='utf-8')
+    ws = book.add_sheet('Statement Sheet')
+    header_style = xlwt.easyxf('font: bold on; pattern: pattern solid, fore_colour yellow')
+    amount_style = xlwt.easyxf(num_format_str='#,##0.00')
+
+    row = 0
+    for row, values in enumerate(statement_title_rows(year_month)):
+        for column, value in enumerate(values):
+            ws.write(row, column, value)
+    for column, title in enumerate(STATEMENT_HEADER):
+        ws.write(row + 1, column, title, header_style)
+    for row, values in enumerate(statement_rows(rows, seed, year_month), row + 2):
+        for column, value in enumerate(values):
+            if value is None:
+                continue
+            if column in (9, 10):
+                ws.write(row, column, value, amount_style)
+            else:
+                ws.write(row, column, value)
+    book.save(path)
+
+
+def receipt_pages(pages, seed=0, start=1, max_pages_per_receipt=3):
+    """生成共pages页的收货单页面文本行，每个收货单1~max_pages_per_receipt页，收货单号从start开始连续编号"""
+    rnd = random.Random(seed)
+    result = []
+    receipt = start
+    while len(result) < pages:
+        vendor = rnd.choice(VENDORS)
+        label = rnd.choice(VENDOR_LABELS)
+        rev_date = f'2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}'
+        count = min(rnd.randint(1, max_pages_per_receipt), pages - len(result))
+        for page in range(count):
+            lines = [
+                '海口索菲特大酒店 收货单 Receiving Report',
+                f'收货单号 RF: RFAH7970{receipt:06d}',
+                f'收货日期 Rev. Date: {rev_date}',
+                f'{label}{vendor}',
+                '部门 Dept: 中厨房',
+            ]
+            lines += [f'{rnd.randint(100000, 999999)} 商品{rnd.randint(1, 999)} 数量 {rnd.randint(1, 50)} '
+                      f'单价 {rnd.randint(1, 500)}.00' for _ in range(20)]
+            lines.append(f'第 {page + 1} 页 / 共 {count} 页')
+            result.append(lines)
+        receipt += 1
+    return result
+
+
+def build_pdf(pages_lines):
+    """
+    由每页的文本行生成PDF：所有页面共用一个Type0字体（Identity-H编码，CID即Unicode码位），
+    ToUnicode映射表使提取文本时得到原文；页面内容流使用Flate压缩
+    """
+    chars = sorted({char for lines in pages_lines for line in lines for char in line})
+    objects = []
+
+    def add(content):
+        objects.append(content)
+        return len(objects)
+
+    catalog = add(None)
+    pages_id = add(None)
+
+    cmap = ('/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n'
+            '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+            '/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n'
+            '1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n')
+    for i in range(0, len(chars), 100):
+        chunk = chars[i:i + 100]
+        cmap += f'{len(chunk)} beginbfchar\n'
+        cmap += ''.join(f'<{ord(char):04X}> <{ord(char):04X}>\n' for char in chunk)
+        cmap += 'endbfchar\n'
+    cmap += 'endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend\n'
+    cmap = cmap.encode()
+    to_unicode = add(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(cmap), cmap))
+    descriptor = add(b'<< /Type /FontDescriptor /FontName /SimSun /Flags 4 /FontBBox [0 -141 1000 859] '
+                     b'/ItalicAngle 0 /Ascent 859 /Descent -141 /CapHeight 700 /StemV 80 >>')
+    cid_font = add(b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /SimSun '
+                   b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+                   b'/FontDescriptor %d 0 R /DW 1000 >>' % descriptor)
+    font = add(b'<< /Type /Font /Subtype /Type0 /BaseFont /SimSun /Encoding /Identity-H '
+               b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (cid_font, to_unicode))
+
+    kids = []
+    for lines in pages_lines:
+        operators = ['BT', '/F1 10 Tf']
+        y = 800
+        for line in lines:
+            operators.append(f"1 0 0 1 40 {y} Tm <{''.join(f'{ord(char):04X}' for char in line)}> Tj")
+            y -= 14
+        operators.append('ET')
+        data = zlib.compress('\n'.join(operators).encode())
+        content = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(data), data))
+        kids.append(add(b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] '
+                        b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (pages_id, font, content)))
+
+    objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id
+    objects[pages_id - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids))
+
+    output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, content in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n%s\nendobj\n' % (number, content)
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        output += b'%010d 00000 n \n' % offset
+    output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog, xref)
+    return bytes(output)
+
+
+def write_receipt_pdf(path, pages, seed=0, start=1):
+    """生成共pages页的多收货单PDF"""
+    with open(path, 'wb') as file:
+        file.write(build_pdf(receipt_pages(pages, seed, start)))
+
+
+def fixture_path(folder, kind, size, seed=0):
+    """基准数据的缓存路径，同样的参数只生成一次"""
+    if kind == 'statement':
+        return os.path.join(folder, f'2025-06_statement_{size}_{seed}.xlsx')
+    if kind == 'xls':
+        return os.path.join(folder, f'2025-06_statement_{size}_{seed}.xls')
+    return os.path.join(folder, f'receipts_{size}_{seed}.pdf')
+
+
+def ensure_fixture(folder, kind, size, seed=0, log=print):
+    """返回基准数据文件路径，不存在时生成"""
+    path = fixture_path(folder, kind, size, seed)
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        log(f'生成基准数据: {path}')
+        temp_path = path + '.tmp'
+        if kind == 'statement':
+            write_statement_xlsx(temp_path, size, seed)
+        elif kind == 'xls':
+            write_statement_xls(temp_path, size, seed)
+        else:
+            write_receipt_pdf(temp_path, size, seed)
+        os.replace(temp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成基准测试用的合成对账单和收货单PDF')
+    parser.add_argument('kind', choices=['statement', 'xls', 'pdf'],
+                        help='statement为对账单，xls为旧版.xls格式的对账单，pdf为收货单PDF')
+    parser.add_argument('output', help='输出文件')
+    parser.add_argument('--rows', type=int, default=1000, help='对账单明细行数')
+    parser.add_argument('--pages', type=int, default=100, help='PDF页数')
+    parser.add_argument('--seed', type=int, default=0, help='随机数种子')
+    parser.add_argument('--start', type=int, default=1, help='第一个收货单号的序号')
+    args = parser.parse_args()
+
+    if args.kind == 'statement':
+        write_statement_xlsx(args.output, args.rows, args.seed)
+    elif args.kind == 'xls':
+        write_statement_xls(args.output, args.rows, args.seed)
+    else:
+        write_receipt_pdf(args.output, args.pages, args.seed, args.start)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,11 @@
-import PyPDF2
-import re
+import multiprocessing
 import os
-import shutil
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from threading import Thread
 from datetime import datetime
+from split_pdf_batch import split_pdfs
+from split_pdf_registry import REGISTRY_FILE, ReceiptRegistry
 
 class PDFSplitterApp:
     def __init__(self, root):
@@ -67,11 +67,17 @@ class PDFSplitterApp:
         self.button_frame = ttk.Frame(main_frame)
         self.button_frame.grid(row=3, column=0, sticky=(tk.E), padx=5, pady=5)
         
+        # 并行处理的进程数，默认为CPU核心数
+        ttk.Label(self.button_frame, text='并行进程数:').grid(row=0, column=0, padx=5)
+        self.workers_var = tk.IntVar(value=os.cpu_count() or 1)
+        self.workers_spinbox = ttk.Spinbox(self.button_frame, from_=1, to=64, width=5, textvariable=self.workers_var)
+        self.workers_spinbox.grid(row=0, column=1, padx=5)
+        
         self.start_button = ttk.Button(self.button_frame, text='开始处理', command=self.start_processing)
-        self.start_button.grid(row=0, column=0, padx=5)
+        self.start_button.grid(row=0, column=2, padx=5)
         
         self.clear_log_button = ttk.Button(self.button_frame, text='清除日志', command=self.clear_results)
-        self.clear_log_button.grid(row=0, column=1, padx=5)
+        self.clear_log_button.grid(row=0, column=3, padx=5)
         
         # 配置grid权重
         self.root.columnconfigure(0, weight=1)
@@ -83,37 +89,31 @@ class PDFSplitterApp:
         
         # 存储选择的文件路径
         self.selected_files = []
-        # 存储已处理的收货单号
-        self.processed_receipts = set()
         # 存储当前输出目录
         self.current_output_dir = None
     
     def load_processed_receipts(self):
+        # 打开登记库（首次打开时导入processed.txt）并显示已处理的收货单数量。
+        # SQLite连接不能跨线程使用，处理时在处理线程中重新打开
         try:
-            if os.path.exists('processed.txt'):
-                with open('processed.txt', 'r', encoding='utf-8') as f:
-                    self.processed_receipts = set(line.strip() for line in f)
-                self.log_message(f'已加载 {len(self.processed_receipts)} 个已处理的收货单号')
+            registry = ReceiptRegistry(REGISTRY_FILE, log=self.log_message)
+            try:
+                self.log_message(f'已加载 {len(registry)} 个已处理的收货单号')
+            finally:
+                registry.close()
         except Exception as e:
             self.log_message(f'加载已处理收货单号时出错: {str(e)}')
     
-    def save_processed_receipts(self, new_receipts):
+    def save_processed_receipts(self, registry):
+        # 本次运行已保存的收货单从运行日志中一次性登记，返回新登记的收货单号
         try:
-            # 先读取现有的收货单号
-            existing_receipts = set()
-            if os.path.exists('processed.txt'):
-                with open('processed.txt', 'r', encoding='utf-8') as f:
-                    existing_receipts = set(line.strip() for line in f)
-            
-            # 追加新的收货单号
-            with open('processed.txt', 'a', encoding='utf-8') as f:
-                for receipt in new_receipts:
-                    if receipt not in existing_receipts:
-                        f.write(receipt + '\n')
-                        self.processed_receipts.add(receipt)
-                        self.log_message(f'添加新的收货单号: {receipt}')
+            new_receipts = registry.commit_journal()
+            for receipt in new_receipts:
+                self.log_message(f'添加新的收货单号: {receipt}')
+            return new_receipts
         except Exception as e:
             self.log_message(f'保存收货单号时出错: {str(e)}')
+            return []
     
     def browse_files(self):
         filenames = filedialog.askopenfilenames(filetypes=[("PDF文件", "*.pdf")])
@@ -128,7 +128,6 @@ class PDFSplitterApp:
     def clear_files(self):
         self.selected_files = []
         self.files_listbox.delete(0, tk.END)
-        self.processed_receipts.clear()
     
     def clear_results(self):
         self.result_text.delete(1.0, tk.END)
@@ -139,6 +138,18 @@ class PDFSplitterApp:
         self.result_text.insert(tk.END, message + '\n')
         self.result_text.see(tk.END)
     
+    def get_workers(self):
+        """读取界面上设置的并行进程数，输入无效时使用1"""
+        try:
+            return max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            return 1
+    
+    def report_progress(self, fraction, message):
+        """每个文件完成读取或保存时更新进度条和状态"""
+        self.progress_var.set(fraction * 100)
+        self.status_var.set(message)
+    
     def cleanup_temp_files(self):
         # 已禁用自动清理功能
         pass
@@ -154,34 +165,16 @@ class PDFSplitterApp:
         self.clear_button.state(['disabled'])
         self.progress_var.set(0)
         self.result_text.delete(1.0, tk.END)
+        self.workers = self.get_workers()
         
         # 在新线程中处理PDF
         Thread(target=self.process_pdfs, daemon=True).start()
     
-    def save_pages_to_file(self, vendor, receipt, pages, base_dir):
-        if receipt in self.processed_receipts:
-            self.log_message(f'跳过已处理的收货单号: {receipt}')
-            return
-            
-        safe_vendor_name = re.sub(r'[<>:"/\\|?*]', '_', vendor)
-        vendor_dir = os.path.join(base_dir, safe_vendor_name)
-        
-        if not os.path.exists(vendor_dir):
-            os.makedirs(vendor_dir)
-            
-        output_path = os.path.join(vendor_dir, f'{receipt}.pdf')
-        writer = PyPDF2.PdfWriter()
-        
-        for page in pages:
-            writer.add_page(page)
-            
-        with open(output_path, 'wb') as output_file:
-            writer.write(output_file)
-            
-        self.log_message(f'已创建文件: {output_path}')
-    
     def process_pdfs(self):
+        registry = None
         try:
+            registry = ReceiptRegistry(REGISTRY_FILE, log=self.log_message)
+            
             # 创建输出目录
             self.current_output_dir = '收货单库'
             if not os.path.exists(self.current_output_dir):
@@ -195,91 +188,29 @@ class PDFSplitterApp:
                 self.log_message(f'创建归档目录: {archive_dir}')
             
             total_files = len(self.selected_files)
-            total_pages = 0
-            total_vendors = set()
-            new_receipts = set()
+            self.log_message(f'共 {total_files} 个PDF文件，使用 {self.workers} 个进程并行处理')
             
-            # 处理每个PDF文件
-            for file_index, pdf_path in enumerate(self.selected_files, 1):
-                self.status_var.set(f'正在处理文件 {file_index}/{total_files}: {os.path.basename(pdf_path)}')
-                self.log_message(f'\n开始处理PDF文件: {pdf_path}')
-                
-                with open(pdf_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    file_pages = len(reader.pages)
-                    total_pages += file_pages
-                    self.log_message(f'PDF文件页数: {file_pages}')
-                    
-                    # 遍历每一页
-                    current_receipt = None
-                    current_vendor = None
-                    page_buffer = []
-                    
-                    for page_num in range(file_pages):
-                        self.progress_var.set((file_index - 1 + (page_num + 1) / file_pages) / total_files * 100)
-                        
-                        # 获取当前页面
-                        page = reader.pages[page_num]
-                        text = page.extract_text()
-                        
-                        # 提取收货单号
-                        receipt_match = re.search(r'收货单号\s*RF:\s*(RFAH7970\d+)', text)
-                        new_receipt = receipt_match.group(1) if receipt_match else None
-                        
-                        # 使用多个正则表达式模式查找供应商信息
-                        patterns = [
-                            r'供应商[/\\]?Vendor[：:](.*?)\n',
-                            r'供应商[/\\]?Vendor[：:](.*?)\s',
-                            r'供应商名称[：:](.*?)\n',
-                            r'供应商名称[：:](.*?)\s',
-                            r'VENDOR[：:](.*?)\n',
-                            r'VENDOR[：:](.*?)\s'
-                        ]
-                        
-                        new_vendor = None
-                        for pattern in patterns:
-                            vendor_match = re.search(pattern, text, re.IGNORECASE)
-                            if vendor_match:
-                                vendor = vendor_match.group(1).strip()
-                                if vendor:
-                                    new_vendor = vendor
-                                    total_vendors.add(vendor)
-                                    break
-                        
-                        # 如果找到新的收货单号或供应商，保存当前缓存的页面
-                        if (new_receipt and new_receipt != current_receipt) or (new_vendor and new_vendor != current_vendor):
-                            if current_vendor and current_receipt and page_buffer:
-                                self.save_pages_to_file(current_vendor, current_receipt, page_buffer, self.current_output_dir)
-                                new_receipts.add(current_receipt)
-                                page_buffer = []
-                            
-                            current_receipt = new_receipt or current_receipt
-                            current_vendor = new_vendor or current_vendor
-                        
-                        # 将当前页面添加到缓存
-                        if current_vendor and current_receipt:
-                            page_buffer.append(page)
-                    
-                    # 保存最后一组页面
-                    if current_vendor and current_receipt and page_buffer:
-                        self.save_pages_to_file(current_vendor, current_receipt, page_buffer, self.current_output_dir)
-                        new_receipts.add(current_receipt)
-                
-                # 将处理完的文件移动到归档目录
-                archive_path = os.path.join(archive_dir, os.path.basename(pdf_path))
-                shutil.move(pdf_path, archive_path)
-                self.log_message(f'已将文件归档: {archive_path}')
+            # 并行读取和保存各文件，收货单号去重和登记库的更新在主进程中集中进行
+            stats = split_pdfs(self.selected_files, self.current_output_dir, archive_dir, registry,
+                               workers=self.workers, log=self.log_message,
+                               log_error=lambda message: self.log_message(f'错误: {message}'),
+                               on_progress=self.report_progress, by_date=False)
+            total_pages = stats['pages']
+            total_vendors = stats['vendors']
             
-            # 保存新的收货单号
+            # 登记新的收货单号
+            new_receipts = self.save_processed_receipts(registry)
             if new_receipts:
-                self.save_processed_receipts(new_receipts)
-                self.log_message(f'\n已保存 {len(new_receipts)} 个新的收货单号到 processed.txt')
+                self.log_message(f'\n已保存 {len(new_receipts)} 个新的收货单号到 {REGISTRY_FILE}')
             
             # 清理临时文件
             self.cleanup_temp_files()
             
             self.status_var.set('处理完成！')
-            messagebox.showinfo('完成', f'PDF文件处理完成！\n共处理 {total_files} 个文件，{total_pages} 页，涉及 {len(total_vendors)} 个供应商。\n新增 {len(new_receipts)} 个收货单号。')
+            message = f'PDF文件处理完成！\n共处理 {total_files} 个文件，{total_pages} 页，涉及 {len(total_vendors)} 个供应商。\n新增 {len(new_receipts)} 个收货单号。'
+            if stats['failed_files']:
+                message += f'\n{len(stats["failed_files"])} 个文件处理失败，未归档，详见日志。'
+            messagebox.showinfo('完成', message)
         
         except Exception as e:
             self.log_message(f'错误: {str(e)}')
@@ -287,6 +218,8 @@ class PDFSplitterApp:
             self.status_var.set('处理出错')
         
         finally:
+            if registry is not None:
+                registry.close()
             self.start_button.state(['!disabled'])
             self.clear_log_button.state(['!disabled'])
             self.browse_button.state(['!disabled'])
@@ -298,4 +231,6 @@ def main():
     root.mainloop()
 
 if __name__ == '__main__':
+    # 打包后的程序在子进程中运行时需要先调用freeze_support
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,296 @@
+import PyPDF2
+import io
+import re
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from split_pdf_cache import PARSER_VERSION, PageTextCache, file_hash
+from split_pdf_header import parse_page_header
+from split_pdf_registry import ReceiptJournal
+from split_pdf_writer import ReceiptPdfWriter
+
+# 每个工作进程一次提取的页数，每提取完一组页面写入一次页面文本缓存
+EXTRACT_CHUNK_PAGES = 50
+
+def extract_pages(reader, page_nums):
+    """提取并解析指定页面，返回 [(页码, 文本, 收货单号, 供应商, 收货日期)]"""
+    pages = []
+    for page_num in page_nums:
+        text = reader.pages[page_num].extract_text()
+        pages.append((page_num, text) + parse_page_header(text))
+    return pages
+
+def extract_pages_in_worker(pdf_path, page_nums):
+    """在工作进程中打开PDF并提取指定页面"""
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        return extract_pages(reader, page_nums)
+
+def read_page_infos(pdf_path, reader, content_hash, page_cache=None, executor=None, log_error=print):
+    """
+    得到每一页的 (收货单号, 供应商, 收货日期)，返回按页码排列的列表和提取文本的页数
+    
+    已缓存的页面直接使用缓存，其余页面按EXTRACT_CHUNK_PAGES分组提取并解析，
+    传入executor时各组由多个进程并行提取，每完成一组写入一次缓存
+    """
+    file_pages = len(reader.pages)
+    cached_pages = page_cache.get_pages(content_hash) if page_cache else {}
+    page_infos = [None] * file_pages
+    missing_pages = []
+    reparsed_pages = []
+    
+    for page_num in range(file_pages):
+        cached = cached_pages.get(page_num)
+        if cached is None:
+            missing_pages.append(page_num)
+            continue
+        text, receipt, vendor, rev_date, parser_version = cached
+        if parser_version != PARSER_VERSION:
+            # 解析规则已变化，从缓存的文本重新解析
+            receipt, vendor, rev_date = parse_page_header(text)
+            reparsed_pages.append((page_num, text, receipt, vendor, rev_date))
+        page_infos[page_num] = (receipt, vendor, rev_date)
+    save_to_page_cache(page_cache, content_hash, reparsed_pages, log_error)
+    
+    chunks = [missing_pages[i:i + EXTRACT_CHUNK_PAGES] for i in range(0, len(missing_pages), EXTRACT_CHUNK_PAGES)]
+    if executor is not None and len(chunks) > 1:
+        futures = [executor.submit(extract_pages_in_worker, pdf_path, chunk) for chunk in chunks]
+        results = (future.result() for future in as_completed(futures))
+    else:
+        # 页数较少时在当前进程中提取，避免进程间传递数据的开销
+        results = (extract_pages(reader, chunk) for chunk in chunks)
+    
+    for pages in results:
+        for page_num, text, receipt, vendor, rev_date in pages:
+            page_infos[page_num] = (receipt, vendor, rev_date)
+        save_to_page_cache(page_cache, content_hash, pages, log_error)
+    
+    return page_infos, len(missing_pages)
+
+def save_to_page_cache(page_cache, content_hash, pages, log_error=print):
+    """将新提取的页面写入缓存，写入失败时只记录错误"""
+    if not page_cache or not pages:
+        return
+    try:
+        page_cache.put_pages(content_hash, pages)
+    except Exception as e:
+        log_error(f'写入页面文本缓存时出错: {str(e)}')
+
+def split_receipts(page_infos):
+    """
+    按页码顺序根据收货单号和供应商的变化拆分页面，返回 [(供应商, 收货单号, 收货日期, [页码])]
+    
+    找到收货单号和供应商之前的页面不属于任何收货单
+    """
+    receipts = []
+    current_receipt = None
+    current_vendor = None
+    current_rev_date = None
+    page_nums = []
+    
+    for page_num, (new_receipt, new_vendor, new_rev_date) in enumerate(page_infos):
+        # 如果找到新的收货单号或供应商，结束当前收货单
+        if (new_receipt and new_receipt != current_receipt) or (new_vendor and new_vendor != current_vendor):
+            if current_vendor and current_receipt and page_nums:
+                receipts.append((current_vendor, current_receipt, current_rev_date, page_nums))
+                page_nums = []
+            
+            current_receipt = new_receipt or current_receipt
+            current_vendor = new_vendor or current_vendor
+            current_rev_date = new_rev_date  # 保存当前收货日期
+        
+        if current_vendor and current_receipt:
+            page_nums.append(page_num)
+    
+    # 最后一组页面
+    if current_vendor and current_receipt and page_nums:
+        receipts.append((current_vendor, current_receipt, current_rev_date, page_nums))
+    return receipts
+
+def segment_pdf(pdf_path, cache_path=None, executor=None):
+    """
+    读取一个PDF文件并拆分为收货单，只读不写，可在工作进程中运行
+    
+    cache_path为页面文本缓存数据库，为None时不使用缓存；传入executor时按页并行提取文本。
+    返回 {'path', 'pages', 'receipts', 'vendors', 'extracted', 'errors'}
+    """
+    # 读取整个文件，同时用于计算内容哈希和解析PDF
+    with open(pdf_path, 'rb') as file:
+        data = file.read()
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    
+    errors = []
+    page_cache = None
+    if cache_path:
+        try:
+            page_cache = PageTextCache(cache_path)
+        except Exception as e:
+            # 缓存不可用时照常逐页提取文本
+            errors.append(f'打开页面文本缓存时出错，将不使用缓存: {str(e)}')
+    try:
+        page_infos, extracted = read_page_infos(pdf_path, reader, file_hash(data), page_cache, executor, errors.append)
+    finally:
+        if page_cache:
+            page_cache.close()
+    
+    return {
+        'path': pdf_path,
+        'pages': len(page_infos),
+        'receipts': split_receipts(page_infos),
+        'vendors': {vendor for _, vendor, _ in page_infos if vendor},
+        'extracted': extracted,
+        'errors': errors,
+    }
+
+def write_receipts(pdf_path, receipts, base_dir, by_date=True, journal_path=None, source_pdf=None):
+    """
+    将一个源文件中的收货单分别保存为 base_dir/供应商/收货日期/收货单号.pdf，可在工作进程中运行
+    
+    所有收货单由同一个ReceiptPdfWriter生成，源文件只读取和解析一次。
+    每个收货单先写入临时文件再改名为目标文件，中断时不会留下不完整的收货单文件。
+    传入journal_path时每保存一个收货单立即写入运行日志，来源PDF记为source_pdf。
+    by_date为False或收货日期为None时直接保存在供应商目录下，
+    返回 [(输出文件路径, 文件大小, 耗时秒数)]
+    """
+    outputs = []
+    journal = ReceiptJournal(journal_path) if journal_path else None
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf_writer = ReceiptPdfWriter(file.read())
+        for vendor, receipt, rev_date, page_nums in receipts:
+            start = time.perf_counter()
+            safe_vendor_name = re.sub(r'[<>:"/\\|?*]', '_', vendor)
+            # 创建供应商目录和日期目录（多个进程可能同时创建同一目录）
+            vendor_dir = os.path.join(base_dir, safe_vendor_name)
+            date_dir = os.path.join(vendor_dir, rev_date) if by_date and rev_date else vendor_dir
+            os.makedirs(date_dir, exist_ok=True)
+            
+            output_path = os.path.join(date_dir, f'{receipt}.pdf')
+            content = pdf_writer.render(page_nums)
+            
+            temp_path = output_path + '.tmp'
+            with open(temp_path, 'wb') as output_file:
+                output_file.write(content)
+                output_file.flush()
+                os.fsync(output_file.fileno())
+            os.replace(temp_path, output_path)
+            
+            if journal:
+                journal.record((receipt, vendor, rev_date, output_path, source_pdf or pdf_path))
+            outputs.append((output_path, len(content), time.perf_counter() - start))
+    finally:
+        if journal:
+            journal.close()
+    return outputs
+
+def split_pdfs(pdf_paths, output_dir, archive_dir, registry, workers=1, log=print, log_error=print,
+               on_progress=None, cache_path=None, by_date=True):
+    """
+    批量拆分PDF文件，多个文件由工作进程并行处理，收货单号去重在主进程中按文件顺序集中决定
+    
+    1. 读取并拆分各文件（工作进程只读不写；只有一个文件时按页并行）
+    2. 按文件顺序决定要保存的收货单：已处理过的和本次运行中重复的收货单号跳过
+    3. 并行保存各文件的收货单，每个文件保存完成后移动到归档目录
+    
+    registry为已处理收货单登记库（ReceiptRegistry）。每保存一个收货单立即写入登记库的运行日志，
+    源文件归档表示该文件已处理完，运行中断后重新运行时已保存的收货单和已归档的文件都会跳过；
+    由调用方在运行结束时调用registry.commit_journal()登记本次保存的收货单。
+    某个文件出错时只跳过该文件。by_date为False时不按收货日期建目录。
+    on_progress(进度0~1, 说明) 在每个文件完成各阶段时调用。
+    返回 {'pages', 'vendors', 'new_receipts', 'skipped_receipts', 'failed_files', 'output_files', 'output_bytes',
+    'write_seconds'}，后三项为保存的收货单文件数、总大小和保存耗时
+    """
+    total_files = len(pdf_paths)
+    stats = {'pages': 0, 'vendors': set(), 'new_receipts': set(), 'skipped_receipts': set(), 'failed_files': [],
+             'output_files': 0, 'output_bytes': 0, 'write_seconds': 0.0}
+    
+    def report(stage, done, total, message):
+        if on_progress:
+            on_progress((stage + done / total) / 2, message)
+    
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # 第一阶段：读取并拆分各文件
+        segments = {}
+        if executor is not None and total_files > 1:
+            futures = {executor.submit(segment_pdf, pdf_path, cache_path): pdf_path for pdf_path in pdf_paths}
+            results = ((futures[future], future) for future in as_completed(futures))
+        else:
+            results = ((pdf_path, None) for pdf_path in pdf_paths)
+        
+        for done, (pdf_path, future) in enumerate(results, 1):
+            try:
+                segment = future.result() if future else segment_pdf(pdf_path, cache_path, executor)
+            except Exception as e:
+                log_error(f'读取PDF文件 {pdf_path} 时出错: {str(e)}')
+                stats['failed_files'].append(pdf_path)
+                continue
+            finally:
+                report(0, done, total_files, f'已读取文件 {done}/{total_files}: {os.path.basename(pdf_path)}')
+            segments[pdf_path] = segment
+            for error in segment['errors']:
+                log_error(error)
+            log(f'\n已读取PDF文件: {pdf_path}')
+            log(f'PDF文件页数: {segment["pages"]}，收货单 {len(segment["receipts"])} 个')
+            if cache_path:
+                log(f'页面文本缓存: 命中 {segment["pages"] - segment["extracted"]} 页，提取 {segment["extracted"]} 页')
+        
+        # 第二阶段：按文件顺序集中去重，已处理的收货单号一次批量查询
+        processed_receipts = registry.find_processed(
+            receipt for segment in segments.values() for _, receipt, _, _ in segment['receipts'])
+        to_write = {}
+        for pdf_path in pdf_paths:
+            if pdf_path not in segments:
+                continue
+            segment = segments[pdf_path]
+            stats['pages'] += segment['pages']
+            stats['vendors'] |= segment['vendors']
+            to_write[pdf_path] = []
+            for vendor, receipt, rev_date, page_nums in segment['receipts']:
+                if receipt in processed_receipts or receipt in stats['new_receipts']:
+                    log(f'跳过已处理的收货单号: {receipt}')
+                    stats['skipped_receipts'].add(receipt)
+                    continue
+                stats['new_receipts'].add(receipt)
+                to_write[pdf_path].append((vendor, receipt, rev_date, page_nums))
+        
+        # 第三阶段：保存收货单并归档源文件，登记库中的来源PDF记为归档后的路径
+        archive_paths = {pdf_path: os.path.join(archive_dir, os.path.basename(pdf_path)) for pdf_path in to_write}
+        write_args = {pdf_path: (pdf_path, receipts, output_dir, by_date, registry.path, archive_paths[pdf_path])
+                      for pdf_path, receipts in to_write.items()}
+        if executor is not None and len(to_write) > 1:
+            futures = {executor.submit(write_receipts, *args): pdf_path for pdf_path, args in write_args.items()}
+            results = ((futures[future], future) for future in as_completed(futures))
+        else:
+            results = ((pdf_path, None) for pdf_path in to_write)
+        
+        for done, (pdf_path, future) in enumerate(results, 1):
+            try:
+                outputs = future.result() if future else write_receipts(*write_args[pdf_path])
+                for output_path, size, seconds in outputs:
+                    log(f'已创建文件: {output_path} ({size / 1024:.1f} KB, {seconds * 1000:.1f} ms)')
+                    stats['output_files'] += 1
+                    stats['output_bytes'] += size
+                    stats['write_seconds'] += seconds
+                
+                # 将处理完的文件移动到归档目录
+                shutil.move(pdf_path, archive_paths[pdf_path])
+                log(f'已将文件归档: {archive_paths[pdf_path]}')
+            except Exception as e:
+                # 保存失败的文件不归档，下次重新处理；出错前已保存的收货单已写入运行日志，不会重复保存
+                log_error(f'保存PDF文件 {pdf_path} 的收货单时出错: {str(e)}')
+                stats['failed_files'].append(pdf_path)
+                stats['new_receipts'] -= {receipt for _, receipt, _, _ in to_write[pdf_path]}
+            finally:
+                report(1, done, len(to_write), f'已保存文件 {done}/{len(to_write)}: {os.path.basename(pdf_path)}')
+        
+        if stats['output_files']:
+            count = stats['output_files']
+            log(f'\n共保存 {count} 个收货单文件，合计 {stats["output_bytes"] / 1024 / 1024:.2f} MB，'
+                f'平均每个 {stats["output_bytes"] / count / 1024:.1f} KB、{stats["write_seconds"] / count * 1000:.1f} ms')
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    return stats
@@ -0,0 +1,62 @@
+import hashlib
+import sqlite3
+
+# 页面文本缓存数据库，与processed.txt放在同一目录
+CACHE_FILE = 'page_cache.db'
+
+# 页面信息解析规则的版本，修改收货单号/供应商/收货日期的解析规则后需要加1，
+# 缓存中旧版本的解析结果会从缓存的文本重新解析，无需重新提取文本
+PARSER_VERSION = 1
+
+
+def file_hash(data):
+    """PDF文件内容的哈希值，文件改名或移动到归档目录后不变"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class PageTextCache:
+    """
+    按PDF文件内容哈希和页码缓存页面文本及解析出的收货单号、供应商、收货日期
+
+    提取页面文本是拆分PDF最慢的一步，中途失败后重新处理同一批文件时，
+    已经提取过的页面直接从缓存读取，不再调用extract_text()
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        # 多个进程可能同时写入，等待其他进程的写入完成
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'file_hash TEXT NOT NULL, '
+            'page_num INTEGER NOT NULL, '
+            'text TEXT NOT NULL, '
+            'receipt TEXT, '
+            'vendor TEXT, '
+            'rev_date TEXT, '
+            'parser_version INTEGER NOT NULL, '
+            'PRIMARY KEY (file_hash, page_num))'
+        )
+        self.conn.commit()
+
+    def get_pages(self, content_hash):
+        """返回该文件已缓存的页面 {页码: (文本, 收货单号, 供应商, 收货日期, 解析版本)}"""
+        rows = self.conn.execute(
+            'SELECT page_num, text, receipt, vendor, rev_date, parser_version FROM pages WHERE file_hash = ?',
+            (content_hash,)
+        )
+        return {row[0]: row[1:] for row in rows}
+
+    def put_pages(self, content_hash, pages):
+        """写入页面 [(页码, 文本, 收货单号, 供应商, 收货日期)] 并立即提交，中途失败时已写入的页面仍然有效"""
+        if not pages:
+            return
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO pages (file_hash, page_num, text, receipt, vendor, rev_date, parser_version) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(content_hash,) + tuple(page) + (PARSER_VERSION,) for page in pages]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,55 @@
+import re
+
+# 页眉字段的正则表达式，导入时编译一次。每个表达式都以固定文字开头，
+# re可以先快速定位该文字再尝试匹配，比合并为一个多选表达式逐字符尝试更快
+RECEIPT_PATTERN = re.compile(r'收货单号\s*RF:\s*(RFAH7970\d+)')
+REV_DATE_PATTERN = re.compile(r'收货日期\s*Rev\. Date:\s*(\d{4}-\d{2}-\d{2})')
+
+# 供应商标签按优先级排列："供应商/Vendor："、"供应商名称："、"Vendor："（Vendor不区分大小写）
+VENDOR_LABEL_PATTERNS = [
+    re.compile(r'供应商(?i:[/\\]?vendor)[：:]'),
+    re.compile(r'供应商名称[：:]'),
+    re.compile(r'(?i:vendor)[：:]'),
+]
+
+WHITESPACE = re.compile(r'\s')
+
+
+def parse_page_header(text):
+    """
+    从页面文本中提取 (收货单号, 供应商, 收货日期)，没有找到的返回None
+
+    每项取页面中第一次出现的值，查找到第一个匹配即停止，正常的收货单只需扫描页眉部分。
+    供应商每种标签只查找一次，标签之后优先取到行尾，没有换行时取到下一个空白字符
+    """
+    receipt_match = RECEIPT_PATTERN.search(text)
+    receipt = receipt_match.group(1) if receipt_match else None
+
+    rev_date_match = REV_DATE_PATTERN.search(text)
+    rev_date = rev_date_match.group(1) if rev_date_match else None
+
+    vendor = None
+    for pattern in VENDOR_LABEL_PATTERNS:
+        label_match = pattern.search(text)
+        if label_match:
+            vendor = label_value(text, label_match.end())
+            if vendor:
+                break
+
+    return receipt, vendor, rev_date
+
+
+def label_value(text, start):
+    """标签之后的供应商名称，去除首尾空白后为空时返回None"""
+    line_end = text.find('\n', start)
+    if line_end >= 0:
+        value = text[start:line_end].strip()
+        if value:
+            return value
+
+    space = WHITESPACE.search(text, start)
+    if space:
+        value = text[start:space.start()].strip()
+        if value:
+            return value
+    return None
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+from datetime import datetime
+
+# 收货单登记库，与原来的processed.txt放在同一目录
+REGISTRY_FILE = 'receipts.db'
+
+# 旧版本记录已处理收货单号的文件，首次打开登记库时导入一次
+LEGACY_FILE = 'processed.txt'
+
+# 批量查询时每条SQL语句包含的收货单号数量（SQLite对参数个数有限制）
+QUERY_BATCH_SIZE = 500
+
+
+def create_tables(conn):
+    """
+    receipts为已登记的收货单；journal为运行日志，每保存一个收货单文件立即写入一条，
+    运行结束时在一个事务中转入receipts。运行中断时journal中的记录在下次打开登记库时登记
+    """
+    for table in ('receipts', 'journal'):
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} ('
+            'receipt TEXT PRIMARY KEY, '
+            'vendor TEXT, '
+            'rev_date TEXT, '
+            'output_path TEXT, '
+            'source_pdf TEXT, '
+            'processed_at TEXT)'
+        )
+    conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.commit()
+
+
+class ReceiptRegistry:
+    """
+    已处理收货单登记库（SQLite），以收货单号为主键建立索引
+
+    记录每个收货单的供应商、收货日期、输出文件和来源PDF。查询收货单号是否已处理时走索引，
+    不需要把全部收货单号读入内存；每次运行新增的收货单先逐个写入运行日志，结束时在一个事务中登记
+    """
+
+    def __init__(self, path=REGISTRY_FILE, legacy_file=LEGACY_FILE, log=print):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        create_tables(self.conn)
+        if legacy_file:
+            self.import_legacy_file(legacy_file, log)
+
+        # 上次运行中断时已保存的收货单在这里登记，恢复运行时跳过
+        recovered = self.commit_journal()
+        if recovered:
+            log(f'上次运行未正常结束，已登记中断前保存的 {len(recovered)} 个收货单')
+
+    def import_legacy_file(self, legacy_file, log=print):
+        """首次打开登记库时导入processed.txt中的收货单号（只有收货单号，其余信息为空），之后不再读取该文件"""
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+            return
+        receipts = []
+        if os.path.exists(legacy_file):
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                receipts = [line.strip() for line in f if line.strip()]
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO receipts (receipt) VALUES (?)',
+                ((receipt,) for receipt in receipts)
+            )
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                (datetime.now().isoformat(timespec='seconds'),)
+            )
+        if receipts:
+            log(f'已从 {legacy_file} 导入 {len(receipts)} 个已处理的收货单号')
+
+    def __contains__(self, receipt):
+        return self.conn.execute('SELECT 1 FROM receipts WHERE receipt = ?', (receipt,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM receipts').fetchone()[0]
+
+    def find_processed(self, receipts):
+        """返回receipts中已处理过的收货单号集合，按批通过索引查询"""
+        receipts = list(dict.fromkeys(receipts))
+        processed = set()
+        for i in range(0, len(receipts), QUERY_BATCH_SIZE):
+            batch = receipts[i:i + QUERY_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            rows = self.conn.execute(f'SELECT receipt FROM receipts WHERE receipt IN ({placeholders})', batch)
+            processed.update(row[0] for row in rows)
+        return processed
+
+    def commit_journal(self):
+        """在一个事务中将运行日志中的收货单转入登记库并清空日志，返回新登记的收货单号列表"""
+        with self.conn:
+            added = [row[0] for row in self.conn.execute(
+                'SELECT receipt FROM journal WHERE receipt NOT IN (SELECT receipt FROM receipts) ORDER BY rowid')]
+            self.conn.execute(
+                'INSERT OR IGNORE INTO receipts (receipt, vendor, rev_date, output_path, source_pdf, processed_at) '
+                'SELECT receipt, vendor, rev_date, output_path, source_pdf, processed_at FROM journal ORDER BY rowid'
+            )
+            self.conn.execute('DELETE FROM journal')
+        return added
+    
+    def close(self):
+        self.conn.close()
+
+
+class ReceiptJournal:
+    """
+    运行日志的写入端，可在工作进程中使用
+
+    每个收货单文件保存完成后立即提交一条 (收货单号, 供应商, 收货日期, 输出文件, 来源PDF)，
+    运行中断后已提交的收货单不会重新保存
+    """
+
+    def __init__(self, path=REGISTRY_FILE):
+        self.conn = sqlite3.connect(path, timeout=30)
+        create_tables(self.conn)
+
+    def record(self, entry):
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO journal (receipt, vendor, rev_date, output_path, source_pdf, processed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                tuple(entry) + (datetime.now().isoformat(timespec='seconds'),)
+            )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,183 @@
+import io
+import PyPDF2
+from PyPDF2.errors import PyPdfError
+from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, read_object
+
+
+class CopyNotSupported(Exception):
+    """源文件的结构不能按原样复制对象（加密、对象流、收货单页面引用了其他页面等）"""
+
+
+class ReceiptPdfWriter:
+    """
+    从一个源PDF中按页码生成多个收货单PDF，源文件只解析一次
+
+    每个对象第一次用到时解析一次并记录其原始字节和引用的对象，之后生成的收货单直接复制这些字节：
+    字体、图片等多页共用的对象在每个输出文件中只写入一次，流数据按原样复制，不解压也不重新压缩。
+    输出文件保留对象在源文件中的编号，只重新生成页面、页面树和目录对象。
+    源文件的结构不适合按原样复制时，该收货单改用PyPDF2.PdfWriter生成
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.reader = PyPDF2.PdfReader(io.BytesIO(data))
+        self.stream = io.BytesIO(data)
+        # {(对象号, 代号): (原始字节, 引用的对象, 是否为页面或页面树节点)}
+        self.objects = {}
+        self.fallbacks = 0
+        # 要复制的对象用严格模式解析：流长度错误等需要修复的对象会报错，该收货单改用PdfWriter生成
+        self.strict_reader = None
+        if not self.reader.is_encrypted:
+            try:
+                self.strict_reader = PyPDF2.PdfReader(io.BytesIO(data), strict=True)
+            except PyPdfError:
+                pass
+
+    def render(self, page_nums):
+        """返回由指定页面组成的PDF文件内容"""
+        if self.strict_reader is not None:
+            try:
+                return self.assemble(page_nums)
+            except (CopyNotSupported, PyPdfError, ValueError, KeyError):
+                pass
+        self.fallbacks += 1
+        return self.render_with_pypdf2(page_nums)
+
+    def render_with_pypdf2(self, page_nums):
+        writer = PyPDF2.PdfWriter()
+        for page_num in page_nums:
+            writer.add_page(self.reader.pages[page_num])
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+    def assemble(self, page_nums):
+        pages = [self.reader.pages[page_num] for page_num in page_nums]
+        page_refs = []
+        for page in pages:
+            ref = page.indirect_reference
+            if ref is None:
+                raise CopyNotSupported('页面不是间接对象')
+            page_refs.append((ref.idnum, ref.generation))
+
+        # 收货单页面引用的所有对象，每个对象只写入一次
+        page_ref_set = set(page_refs)
+        needed = set()
+        pending = [ref for page in pages for ref in direct_refs(page, skip_parent=True)]
+        while pending:
+            ref = pending.pop()
+            if ref in needed or ref in page_ref_set:
+                continue
+            entry = self.load_object(ref)
+            if entry is None:
+                # 不存在的对象按PDF规范视为null，保留引用即可
+                continue
+            raw, refs, is_page = entry
+            if is_page:
+                raise CopyNotSupported('收货单页面引用了其他页面')
+            needed.add(ref)
+            pending.extend(refs)
+
+        all_nums = [idnum for idnum, _ in needed] + [idnum for idnum, _ in page_refs]
+        pages_num = max(all_nums) + 1
+        catalog_num = pages_num + 1
+        pages_ref = IndirectObject(pages_num, 0, None)
+
+        output = io.BytesIO()
+        output.write(self.reader.pdf_header.encode('latin-1') + b'\n%\xe2\xe3\xcf\xd3\n')
+        offsets = {}
+        for ref in sorted(needed):
+            offsets[ref] = output.tell()
+            output.write(self.objects[ref][0])
+            output.write(b'\nendobj\n')
+
+        for ref, page in zip(page_refs, pages):
+            # 页面对象已包含从页面树继承的属性，只替换父节点
+            page_dict = DictionaryObject({key: value for key, value in page.items() if key != '/Parent'})
+            page_dict[NameObject('/Parent')] = pages_ref
+            offsets[ref] = output.tell()
+            output.write(b'%d %d obj\n' % ref)
+            page_dict.write_to_stream(output, None)
+            output.write(b'\nendobj\n')
+
+        kids = b' '.join(b'%d %d R' % ref for ref in page_refs)
+        offsets[(pages_num, 0)] = output.tell()
+        output.write(b'%d 0 obj\n<< /Type /Pages /Kids [ %s ] /Count %d >>\nendobj\n' % (pages_num, kids, len(pages)))
+        offsets[(catalog_num, 0)] = output.tell()
+        output.write(b'%d 0 obj\n<< /Type /Catalog /Pages %d 0 R >>\nendobj\n' % (catalog_num, pages_num))
+
+        xref_offset = output.tell()
+        output.write(b'xref\n')
+        output.write(xref_table(offsets))
+        output.write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                     % (catalog_num + 1, catalog_num, xref_offset))
+        return output.getvalue()
+
+    def load_object(self, ref):
+        """
+        解析对象并缓存其原始字节 "n g obj ... " 和引用的对象，返回 (原始字节, 引用, 是否为页面)；
+        对象不存在时返回None
+        """
+        if ref in self.objects:
+            return self.objects[ref]
+        idnum, generation = ref
+        reader = self.strict_reader
+        if idnum in reader.xref_objStm:
+            raise CopyNotSupported('对象存放在对象流中')
+        offset = reader.xref.get(generation, {}).get(idnum)
+        if offset is None or reader.xref_free_entry.get(generation, {}).get(idnum, False):
+            self.objects[ref] = None
+            return None
+
+        self.stream.seek(offset)
+        if reader.read_object_header(self.stream) != ref:
+            raise CopyNotSupported('交叉引用表与对象编号不符')
+        obj = read_object(self.stream, reader)
+        end = self.stream.tell()
+        # 对象之后必须紧跟endobj，原始字节才是完整的对象
+        if self.data[end:end + 20].lstrip()[:6] != b'endobj':
+            raise CopyNotSupported('对象没有以endobj结束')
+
+        is_page = isinstance(obj, DictionaryObject) and obj.get('/Type') in ('/Page', '/Pages')
+        entry = (self.data[offset:end], [] if is_page else direct_refs(obj), is_page)
+        self.objects[ref] = entry
+        return entry
+
+
+def direct_refs(obj, skip_parent=False):
+    """对象中直接引用的间接对象 [(对象号, 代号)]，不展开被引用的对象"""
+    refs = []
+    if skip_parent:
+        stack = [value for key, value in obj.items() if key != '/Parent']
+    else:
+        stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, IndirectObject):
+            refs.append((value.idnum, value.generation))
+        elif isinstance(value, DictionaryObject):
+            stack.extend(value.values())
+        elif isinstance(value, ArrayObject):
+            stack.extend(value)
+    return refs
+
+
+def xref_table(offsets):
+    """按对象号连续的区段生成交叉引用表，未使用的对象号不占位置"""
+    entries = sorted((idnum, generation, offset) for (idnum, generation), offset in offsets.items())
+    sections = [[(0, 65535, None)]]
+    for entry in entries:
+        if entry[0] == sections[-1][-1][0] + 1:
+            sections[-1].append(entry)
+        else:
+            sections.append([entry])
+
+    lines = []
+    for section in sections:
+        lines.append(b'%d %d\n' % (section[0][0], len(section)))
+        for idnum, generation, offset in section:
+            if offset is None:
+                lines.append(b'0000000000 65535 f \n')
+            else:
+                lines.append(b'%010d %05d n \n' % (offset, generation))
+    return b''.join(lines)
@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import sys
+from collections import deque
+
+import pandas as pd
+
+# 分类规则文件，与config.txt放在同一目录
+RULES_FILE = "rules.txt"
+
+# 未匹配任何规则的商品标记为其他
+DEFAULT_LABEL = "其他"
+
+# 规则文件中的匹配方式
+CONTAINS = "contains"
+EXACT = "exact"
+MATCH_TYPES = {
+    "包含": CONTAINS,
+    "contains": CONTAINS,
+    "等于": EXACT,
+    "exact": EXACT,
+}
+
+# 内置分类规则 (优先级, 匹配方式, 关键词, 品类)，没有规则文件时使用
+# 1. 干货：M列内容有"鱼虾蟹干及瑶柱干"，"海参鲍鱼鱼翅干及肚干"，"其他水产干货"，"燕窝"
+# 2. 海鲜：M列内容包含"活鲜"2个字
+# 3. 酒类：M列内容包含"酒"1个字
+# 4. 饮料：M列内容包含"饮料"2个字
+# 5. 水：M列内容只有"水"这个字
+DEFAULT_RULES = [
+    (1, CONTAINS, "鱼虾蟹干及瑶柱干", "干货"),
+    (1, CONTAINS, "海参鲍鱼鱼翅干及肚干", "干货"),
+    (1, CONTAINS, "其他水产干货", "干货"),
+    (1, CONTAINS, "燕窝", "干货"),
+    (2, CONTAINS, "活鲜", "海鲜"),
+    (3, CONTAINS, "酒", "酒类"),
+    (4, CONTAINS, "饮料", "饮料"),
+    (5, EXACT, "水", "水"),
+]
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick多关键词匹配器
+
+    所有关键词编译为一个自动机，一次扫描字符串即可找到匹配的关键词，
+    扫描耗时与关键词数量无关。每个关键词对应一个可比较的值，search()返回匹配到的最小值。
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.best = [None]
+
+        # 构建关键词字典树
+        for keyword, value in keywords:
+            node = 0
+            for char in keyword:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto[node][char] = next_node
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                node = next_node
+            self.best[node] = _min_value(self.best[node], value)
+
+        # 按层次计算失败指针，并把失败指针指向节点的匹配结果合并到当前节点
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, next_node in self.goto[node].items():
+                pending.append(next_node)
+                fail_node = self.fail[node]
+                while fail_node and char not in self.goto[fail_node]:
+                    fail_node = self.fail[fail_node]
+                self.fail[next_node] = self.goto[fail_node].get(char, 0)
+                self.best[next_node] = _min_value(self.best[next_node], self.best[self.fail[next_node]])
+
+    def search(self, text):
+        """扫描一次text，返回匹配到的关键词中最小的值，没有匹配时返回None"""
+        goto = self.goto
+        fail = self.fail
+        best = self.best
+        node = 0
+        found = None
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            value = best[node]
+            if value is not None and (found is None or value < found):
+                found = value
+        return found
+
+
+class RuleSet:
+    """编译后的分类规则表，启动时编译一次，之后每个M列内容只需扫描一次"""
+
+    def __init__(self, rules, source=None):
+        self.rules = [tuple(rule) for rule in rules]
+        self.source = source
+
+        # 同优先级的规则按规则表中的先后顺序
+        contains_rules = []
+        self.exact_rules = {}
+        for index, (priority, match_type, keyword, label) in enumerate(self.rules):
+            value = (priority, index, label)
+            if match_type == CONTAINS:
+                contains_rules.append((keyword, value))
+            else:
+                self.exact_rules[keyword] = _min_value(self.exact_rules.get(keyword), value)
+        self.matcher = KeywordMatcher(contains_rules)
+
+        # 汇总表中的品类顺序：按优先级排列，最后为其他
+        self.categories = []
+        for priority, index, label in sorted((rule[0], i, rule[3]) for i, rule in enumerate(self.rules)):
+            if label not in self.categories and label != DEFAULT_LABEL:
+                self.categories.append(label)
+        self.categories.append(DEFAULT_LABEL)
+
+        # 规则表版本，规则变化时随之变化
+        self.version = hashlib.sha1(repr(self.rules).encode("utf-8")).hexdigest()[:12]
+
+    def classify(self, m_value):
+        """对单个M列内容进行分类，M列内容为空时返回空字符串"""
+        # 如果M列内容为空，则不进行标记
+        if not m_value:
+            return ""
+        found = _min_value(self.matcher.search(m_value), self.exact_rules.get(m_value))
+        return found[2] if found is not None else DEFAULT_LABEL
+
+
+def _min_value(a, b):
+    """返回两个可能为None的值中较小的一个"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+def get_rules_path():
+    """规则文件路径：与config.txt相同，位于程序所在目录"""
+    base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(__file__))
+    return os.path.join(base_dir, RULES_FILE)
+
+
+def load_rules(path=None):
+    """
+    读取并编译分类规则表，规则文件不存在时使用内置规则
+
+    规则文件每行格式为：优先级,匹配方式,关键词,品类
+    匹配方式为"包含"或"等于"，以#开头的行和空行忽略
+    """
+    if path is None:
+        path = get_rules_path()
+    if not os.path.exists(path):
+        return RuleSet(DEFAULT_RULES)
+
+    rules = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [part.strip() for part in line.split(",")]
+            if len(parts) != 4:
+                raise ValueError(f"分类规则第{line_number}行格式错误，应为：优先级,匹配方式,关键词,品类")
+            priority, match_type, keyword, label = parts
+            try:
+                priority = int(priority)
+            except ValueError:
+                raise ValueError(f"分类规则第{line_number}行的优先级不是整数: {priority}")
+            if match_type not in MATCH_TYPES:
+                raise ValueError(f"分类规则第{line_number}行的匹配方式无效: {match_type}")
+            if not keyword or not label:
+                raise ValueError(f"分类规则第{line_number}行的关键词或品类为空")
+            rules.append((priority, MATCH_TYPES[match_type], keyword, label))
+    return RuleSet(rules, source=path)
+
+
+# 已编译的默认规则表及其对应的 (文件路径, 修改时间)
+_default_rule_set = None
+_default_rule_key = None
+
+
+def get_rule_set():
+    """返回默认规则表，只在首次使用或规则文件修改后重新读取和编译"""
+    global _default_rule_set, _default_rule_key
+    path = get_rules_path()
+    key = (path, os.path.getmtime(path) if os.path.exists(path) else None)
+    if _default_rule_set is None or key != _default_rule_key:
+        _default_rule_set = load_rules(path)
+        _default_rule_key = key
+    return _default_rule_set
+
+
+class ClassificationCache:
+    """
+    按M列内容缓存分类结果
+
+    M列只有几百个不同的取值，同一批文件之间可以共用一个缓存，每个取值只匹配一次规则。
+    缓存可以保存到磁盘，规则表版本变化时自动失效。hits/misses记录缓存命中和未命中的次数。
+    """
+
+    def __init__(self, rule_set=None, labels=None):
+        self.rule_set = rule_set if rule_set is not None else get_rule_set()
+        self.labels = dict(labels) if labels else {}
+        # 本次运行中新增的缓存项，用于合并多进程的结果
+        self.added = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path, rule_set=None, log=print):
+        """从磁盘读取缓存，文件不存在、损坏或规则表版本不一致时返回空缓存"""
+        cache = cls(rule_set)
+        if not os.path.exists(path):
+            return cache
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log(f"警告：读取分类缓存失败，将重新分类: {str(e)}")
+            return cache
+        if data.get("version") != cache.rule_set.version:
+            log("分类规则已变化，分类缓存已失效")
+            return cache
+        cache.labels.update(data.get("labels", {}))
+        return cache
+
+    def save(self, path):
+        """将缓存和规则表版本写入磁盘（先写临时文件再替换，避免写入中断损坏缓存）"""
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.rule_set.version, "labels": self.labels}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def classify(self, m_value):
+        """返回单个M列内容的分类结果，已缓存时不再匹配规则"""
+        key = normalize_m_value(m_value)
+        label = self.labels.get(key)
+        if label is not None:
+            self.hits += 1
+            return label
+        self.misses += 1
+        label = self.labels[key] = self.added[key] = self.rule_set.classify(key)
+        return label
+
+    def merge(self, labels, hits=0, misses=0):
+        """合并其他进程中得到的缓存项和命中次数"""
+        for key, label in labels.items():
+            if key not in self.labels:
+                self.labels[key] = self.added[key] = label
+        self.hits += hits
+        self.misses += misses
+
+    def stats_message(self):
+        """缓存命中情况，用于输出日志"""
+        return f"分类缓存：命中 {self.hits} 次，未命中 {self.misses} 次，共缓存 {len(self.labels)} 个不同取值"
+
+
+def normalize_m_value(m_value):
+    """缓存键：空值为空字符串，其余与分类时一致转换为字符串"""
+    if m_value is None or (isinstance(m_value, float) and m_value != m_value):
+        return ""
+    return str(m_value)
+
+
+def classify_value(m_value, rule_set=None):
+    """
+    按分类规则对单个M列内容进行分类，M列内容为空时返回空字符串
+    """
+    if rule_set is None:
+        rule_set = get_rule_set()
+    return rule_set.classify(m_value)
+
+
+def classify_series(m_values, rule_set=None, cache=None):
+    """
+    对整列M列内容进行分类，返回与输入索引一致的分类结果Series
+
+    M列只有少量不同的取值，因此只对每个不同的取值查询一次分类缓存，
+    再通过映射一次性填充整列，不再逐行循环。M列为空的行保持为空字符串。
+    传入cache时使用该缓存（及其规则表），可在多个文件之间共用。
+    """
+    if cache is None:
+        cache = ClassificationCache(rule_set)
+    labels = pd.Series("", index=m_values.index, dtype=object)
+
+    # 与逐行处理时一致：非空值先转换为字符串再判断
+    non_empty = m_values[m_values.notna()].astype(str)
+    if non_empty.empty:
+        return labels
+
+    # 每个不同的取值只分类一次
+    lookup = {value: cache.classify(value) for value in pd.unique(non_empty)}
+    labels.loc[non_empty.index] = non_empty.map(lookup)
+    return labels
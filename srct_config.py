@@ -0,0 +1,113 @@
+import hashlib
+import os
+import sys
+
+# 酒店信息文件，程序目录下的为默认配置，对账单所在文件夹中的优先
+CONFIG_FILE = "config.txt"
+
+# config.txt中的单元格及对应的酒店信息字段，确认函中写入相应位置
+CONFIG_KEYS = {
+    "B2": "hotel_name",
+    "D2": "address",
+    "E2": "contact",
+    "B32": "email",
+}
+
+
+class HotelConfig:
+    """
+    从config.txt读取并校验后的酒店信息：酒店名称、地址、财务部联系人和邮箱地址
+
+    source 为读取的文件路径（文件不存在时为None）；warnings 为校验时发现的问题，
+    读取时输出到日志；version 随酒店信息变化，用于判断确认函是否需要重新生成
+    """
+
+    def __init__(self, hotel_name="", address="", contact="", email="", source=None, warnings=()):
+        self.hotel_name = hotel_name
+        self.address = address
+        self.contact = contact
+        self.email = email
+        self.source = source
+        self.warnings = list(warnings)
+        values = (hotel_name, address, contact, email)
+        self.version = hashlib.sha1(repr(values).encode("utf-8")).hexdigest()[:12]
+
+
+def get_config_path():
+    """程序目录下的config.txt（打包后为可执行文件所在目录）"""
+    base_dir = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(__file__))
+    return os.path.join(base_dir, CONFIG_FILE)
+
+
+def config_path_for(file_path):
+    """对账单使用的config.txt：所在文件夹中有config.txt时使用该文件（多个酒店分文件夹存放），否则使用程序目录下的"""
+    folder_config = os.path.join(os.path.dirname(os.path.abspath(file_path)), CONFIG_FILE)
+    if os.path.exists(folder_config):
+        return folder_config
+    return get_config_path()
+
+
+def load_config(path=None):
+    """
+    读取并校验config.txt，文件不存在或无法读取时酒店信息为空
+
+    每行格式为：单元格:内容，如"B2:某某酒店"；以#开头的行和空行忽略。
+    格式错误、不使用的单元格和重复的单元格记录在warnings中，不影响其他行
+    """
+    if path is None:
+        path = get_config_path()
+    if not os.path.exists(path):
+        return HotelConfig()
+
+    values = {}
+    warnings = []
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError) as e:
+        return HotelConfig(source=path, warnings=[f"读取config.txt失败: {str(e)}"])
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        key = key.strip()
+        if not separator or not key:
+            warnings.append(f"config.txt第{line_number}行格式错误，应为：单元格:内容")
+        elif key not in CONFIG_KEYS:
+            warnings.append(f"config.txt第{line_number}行的{key}不会写入确认函，"
+                            f"可用的单元格为：{'、'.join(CONFIG_KEYS)}")
+        else:
+            if CONFIG_KEYS[key] in values:
+                warnings.append(f"config.txt第{line_number}行重复设置了{key}，使用该行的内容")
+            values[CONFIG_KEYS[key]] = value.strip()
+    if not values.get("hotel_name"):
+        warnings.append("config.txt中没有设置酒店名称（B2）")
+    return HotelConfig(source=path, warnings=warnings, **values)
+
+
+# 已读取的酒店信息 {config.txt路径: (修改时间, HotelConfig)}
+_configs = {}
+
+
+def get_hotel_config(path=None, log=print):
+    """返回config.txt中的酒店信息，每个文件只在首次使用或修改后重新读取和校验，读取时输出校验警告"""
+    if path is None:
+        path = get_config_path()
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    cached = _configs.get(path)
+    if cached is None or cached[0] != mtime:
+        config = load_config(path)
+        _configs[path] = (mtime, config)
+        if config.source:
+            log(f"已从{config.source}读取酒店信息")
+        for warning in config.warnings:
+            log(f"警告：{warning}")
+        return config
+    return cached[1]
+
+
+def get_file_config(file_path, log=print):
+    """对账单使用的酒店信息（见config_path_for）"""
+    return get_hotel_config(config_path_for(file_path), log)
@@ -0,0 +1,164 @@
+import math
+import os
+import zipfile
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from srct_summary import EMPLOYEE_GROUP, OTHER_GROUP, TAX, UNTAXED
+
+# 汇总表文件名前缀，查找对账单文件时跳过汇总表
+CONSOLIDATED_PREFIX = "供应商对账汇总"
+
+# 写入汇总表文档属性（类别）的标记，命令行指定了其他文件名的汇总表也能据此跳过
+CONSOLIDATED_MARKER = "SRCT-consolidated"
+
+# 每个品类的金额列：(分组, 指标, 列标题)
+AMOUNT_COLUMNS = [
+    (EMPLOYEE_GROUP, UNTAXED, "员餐不含税金额"),
+    (EMPLOYEE_GROUP, TAX, "员餐税费"),
+    (OTHER_GROUP, UNTAXED, "非员餐不含税金额"),
+    (OTHER_GROUP, TAX, "非员餐税费"),
+]
+TOTAL_TITLES = ["不含税金额", "税费", "总应付金额"]
+
+# 金额为0时显示为"-"，与确认函一致
+AMOUNT_FORMAT = '#,##0.00;-#,##0.00;"-"'
+
+HEADER_ROW = 3
+FIRST_DATA_ROW = HEADER_ROW + 2
+
+
+def get_consolidated_file(output_dir):
+    """本批处理的多供应商汇总表路径"""
+    return os.path.join(output_dir, f"{CONSOLIDATED_PREFIX}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+
+
+def is_consolidated_workbook(file_path):
+    """是否为本程序生成的多供应商汇总表：只读取文档属性中的标记，不加载工作簿"""
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            core = archive.read("docProps/core.xml")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return False
+    return f">{CONSOLIDATED_MARKER}<".encode("utf-8") in core
+
+
+def collect_suppliers(results):
+    """
+    由批处理各文件的结果汇总出每个供应商的品类金额，不重新读取输出文件
+
+    同一供应商有多个对账单文件时金额合并为一行。
+    返回 (品类列表, [(供应商, 文件名列表, {(品类, 分组, 指标): 金额})])，均按第一次出现的顺序排列
+    """
+    categories = []
+    suppliers = {}
+    for result in results:
+        if not result["success"] or not result.get("categories"):
+            continue
+        files, amounts = suppliers.setdefault(result["supplier"], ([], {}))
+        files.append(os.path.basename(result["file"]))
+        for category, groups in result["categories"].items():
+            if category not in categories:
+                categories.append(category)
+            for group_name, values in groups.items():
+                for metric, amount in values.items():
+                    amounts.setdefault((category, group_name, metric), []).append(amount)
+    rows = [
+        (supplier, files, {key: math.fsum(values) for key, values in amounts.items()})
+        for supplier, (files, amounts) in suppliers.items()
+    ]
+    return categories, rows
+
+
+def write_consolidated_workbook(results, output_file, log=print):
+    """
+    生成多供应商汇总表：每个供应商一行，列出各品类在员餐/非员餐下的不含税金额和税费及合计，
+    最后一行为所有供应商的合计。返回写入的供应商数量
+    """
+    categories, rows = collect_suppliers(results)
+    if not rows:
+        log("没有处理成功的文件，不生成多供应商汇总表")
+        return 0
+
+    wb = Workbook()
+    wb.properties.category = CONSOLIDATED_MARKER
+    ws = wb.active
+    ws.title = "供应商汇总"
+    last_column = 2 + len(categories) * len(AMOUNT_COLUMNS) + len(TOTAL_TITLES)
+
+    ws.cell(row=1, column=1, value="供应商对账汇总").font = Font(bold=True, size=16)
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=min(last_column, 8))
+    ws.cell(row=2, column=1, value=f"共 {len(rows)} 个供应商，生成时间：{datetime.now().strftime('%Y-%m-%d %H:%M')}")
+
+    # 两行表头：第一行为品类，第二行为员餐/非员餐的不含税金额和税费
+    for column, title in ((1, "供应商"), (2, "对账单文件")):
+        ws.cell(row=HEADER_ROW, column=column, value=title)
+        ws.merge_cells(start_row=HEADER_ROW, start_column=column, end_row=HEADER_ROW + 1, end_column=column)
+    amount_titles = [title for _, _, title in AMOUNT_COLUMNS]
+    header_groups = [(category, amount_titles) for category in categories] + [("合计", TOTAL_TITLES)]
+    column = 3
+    for title, subtitles in header_groups:
+        ws.cell(row=HEADER_ROW, column=column, value=title)
+        ws.merge_cells(start_row=HEADER_ROW, start_column=column, end_row=HEADER_ROW,
+                       end_column=column + len(subtitles) - 1)
+        for offset, subtitle in enumerate(subtitles):
+            ws.cell(row=HEADER_ROW + 1, column=column + offset, value=subtitle)
+        column += len(subtitles)
+
+    # 各供应商一行，最后一行为合计
+    table = []
+    for supplier, files, amounts in rows:
+        values = [amounts.get((category, group_name, metric), 0.0)
+                  for category in categories for group_name, metric, _ in AMOUNT_COLUMNS]
+        untaxed = math.fsum(amounts.get((category, group_name, UNTAXED), 0.0)
+                            for category in categories for group_name in (EMPLOYEE_GROUP, OTHER_GROUP))
+        tax = math.fsum(amounts.get((category, group_name, TAX), 0.0)
+                        for category in categories for group_name in (EMPLOYEE_GROUP, OTHER_GROUP))
+        table.append([supplier, "、".join(files)] + values + [untaxed, tax, untaxed + tax])
+    table.append(["合计", ""] + [math.fsum(row[index] for row in table) for index in range(2, last_column)])
+
+    for row_offset, values in enumerate(table):
+        for column, value in enumerate(values, 1):
+            ws.cell(row=FIRST_DATA_ROW + row_offset, column=column, value=value)
+
+    _apply_styles(ws, FIRST_DATA_ROW + len(table) - 1, last_column)
+    wb.save(output_file)
+    log(f"已生成多供应商汇总表（{len(rows)} 个供应商）: {output_file}")
+    return len(rows)
+
+
+def _apply_styles(ws, last_row, last_column):
+    """设置表头、金额和合计行的格式，样式与确认函一致"""
+    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin'))
+    header_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
+    total_fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
+    center = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    right = Alignment(horizontal='right', vertical='center')
+    left = Alignment(horizontal='left', vertical='center')
+
+    for row in ws.iter_rows(min_row=HEADER_ROW, max_row=last_row, max_col=last_column):
+        for cell in row:
+            cell.border = thin_border
+            if cell.row < FIRST_DATA_ROW:
+                cell.font = Font(bold=True)
+                cell.fill = header_fill
+                cell.alignment = center
+            elif cell.column > 2:
+                cell.number_format = AMOUNT_FORMAT
+                cell.alignment = right
+            else:
+                cell.alignment = left
+            if cell.row == last_row:
+                cell.font = Font(bold=True)
+                cell.fill = total_fill
+
+    ws.column_dimensions["A"].width = 30
+    ws.column_dimensions["B"].width = 30
+    for column in range(3, last_column + 1):
+        ws.column_dimensions[get_column_letter(column)].width = 14
+    ws.row_dimensions[HEADER_ROW + 1].height = 30
+    ws.freeze_panes = ws.cell(row=FIRST_DATA_ROW, column=3)
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+
+from srct_config import get_file_config
+
+# 处理记录文件，保存在对账单所在的文件夹中
+MANIFEST_FILE = "SRCT_manifest.json"
+MANIFEST_VERSION = 1
+
+# 跳过未变化的文件时沿用的上次处理结果
+RECORDED_KEYS = ["output_file", "rows", "untaxed", "tax", "total", "supplier", "categories"]
+
+
+def content_hash(path):
+    """文件内容的SHA-256哈希值"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def processing_mode(edit_in_place=False, streaming=False):
+    """处理方式不同时输出文件不同，需要重新处理"""
+    if streaming:
+        return "streaming"
+    return "in_place" if edit_in_place else "copy"
+
+
+class IncrementalBuild:
+    """
+    增量处理：记录每个对账单的内容哈希、分类规则版本、所用酒店信息的版本和输出文件，
+    再次处理同一文件夹时跳过这些都没有变化且输出文件仍存在的文件
+
+    每个文件夹一个处理记录文件（SRCT_manifest.json），按文件名记录。
+    文件大小和修改时间与记录一致时不重新计算哈希；直接在原文件上操作时记录的是处理后的文件内容。
+    force=True 时所有文件都重新处理，处理结果仍会更新到记录中。
+    本次处理需要上次没有生成的结果时不跳过：profile=True 时每个文件都要记录性能，
+    sidecar=True 时还没有解析结果缓存文件的对账单需要重新处理以生成缓存
+    """
+
+    def __init__(self, rules_version, mode, force=False, log=print, profile=False, sidecar=False):
+        self.rules_version = rules_version
+        self.mode = mode
+        self.force = force
+        self.log = log
+        self.profile = profile
+        self.sidecar = sidecar
+        # {文件夹: {文件名: 记录}}
+        self.manifests = {}
+        self.changed = set()
+
+    def _manifest(self, folder):
+        if folder not in self.manifests:
+            entries = {}
+            path = os.path.join(folder, MANIFEST_FILE)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    if data.get("version") == MANIFEST_VERSION:
+                        entries = data.get("files", {})
+                except (OSError, ValueError) as e:
+                    self.log(f"警告：读取处理记录失败，将重新处理所有文件: {str(e)}")
+            self.manifests[folder] = entries
+        return self.manifests[folder]
+
+    def up_to_date(self, file_path):
+        """文件无需重新处理时返回上次的处理结果（skipped为True），否则返回None"""
+        if self.force or self.profile:
+            return None
+        if self.sidecar:
+            # srct_sidecar导入了本模块，在使用时才导入
+            from srct_sidecar import sidecar_missing
+            if sidecar_missing(file_path):
+                return None
+        folder, name = os.path.split(os.path.abspath(file_path))
+        entries = self._manifest(folder)
+        entry = entries.get(name)
+        if (entry is None or entry.get("rules") != self.rules_version
+                or entry.get("config") != get_file_config(file_path, self.log).version or entry.get("mode") != self.mode):
+            return None
+        try:
+            output_file = entry["result"]["output_file"]
+            if not output_file or not os.path.exists(output_file):
+                return None
+            stat = os.stat(file_path)
+            if [stat.st_size, stat.st_mtime_ns] != [entry.get("size"), entry.get("mtime_ns")]:
+                # 修改时间变化但内容相同（如复制或另存为）时仍然跳过，并更新记录的修改时间
+                if content_hash(file_path) != entry.get("hash"):
+                    return None
+                entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+                self.changed.add(folder)
+        except (OSError, KeyError):
+            return None
+
+        result = {
+            "file": file_path,
+            "success": True,
+            "elapsed": 0.0,
+            "error": None,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "skipped": True,
+        }
+        result.update({key: entry["result"].get(key) for key in RECORDED_KEYS})
+        return result
+
+    def record(self, result):
+        """记录处理结果：成功时记录文件当前的内容，失败时删除记录，下次重新处理"""
+        if result.get("skipped"):
+            return
+        folder, name = os.path.split(os.path.abspath(result["file"]))
+        entries = self._manifest(folder)
+        if not result["success"]:
+            self._remove(folder, name)
+            return
+        try:
+            stat = os.stat(result["file"])
+            entries[name] = {
+                "hash": content_hash(result["file"]),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "rules": self.rules_version,
+                "config": get_file_config(result["file"], self.log).version,
+                "mode": self.mode,
+                "result": {key: result.get(key) for key in RECORDED_KEYS},
+            }
+        except OSError:
+            self._remove(folder, name)
+            return
+        self.changed.add(folder)
+
+    def _remove(self, folder, name):
+        """删除文件的记录，只有确实删除了记录时才需要保存该文件夹的处理记录"""
+        if self._manifest(folder).pop(name, None) is not None:
+            self.changed.add(folder)
+
+    def save(self):
+        """将有变化的处理记录写入各文件夹（先写临时文件再替换）"""
+        for folder in sorted(self.changed):
+            path = os.path.join(folder, MANIFEST_FILE)
+            temp_path = path + ".tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"version": MANIFEST_VERSION, "files": self.manifests[folder]}, f,
+                              ensure_ascii=False, indent=2)
+                os.replace(temp_path, path)
+            except OSError as e:
+                self.log(f"警告：保存处理记录失败: {str(e)}")
+        self.changed.clear()
@@ -0,0 +1,455 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from openpyxl import Workbook
+
+from srct_classifier import ClassificationCache, classify_series
+from srct_config import get_file_config
+from srct_consolidated import CONSOLIDATED_PREFIX, is_consolidated_workbook
+from srct_profile import StageProfiler, format_profile
+from srct_sheet import supplier_from_file_name, write_confirmation_sheet
+from srct_sidecar import SidecarColumns, load_sidecar, save_sidecar
+from srct_streaming import stream_statement
+from srct_summary import COUNT, EMPLOYEE_GROUP, OTHER_GROUP, TAX, UNTAXED, summarize_by_category
+from srct_workbook import is_xls, load_statement, write_column
+
+# 分类结果列的列名（插入在M列之后）
+CLASSIFICATION_COLUMN = "品类标记"
+
+# 输出文件名的后缀（见get_output_file和get_confirmation_file），查找对账单文件时跳过
+OUTPUT_SUFFIXES = ("_分类", "_确认函")
+
+
+def find_statement_files(folder):
+    """查找文件夹中的所有Excel文件（不包括上次处理生成的分类文件、确认函和多供应商汇总表）"""
+    files = glob.glob(os.path.join(folder, "*.xlsx")) + glob.glob(os.path.join(folder, "*.xls"))
+    return [path for path in files if not is_output_file(path)]
+
+
+def is_output_file(file_path):
+    """是否为本程序生成的输出文件（多供应商汇总表按文件名前缀或文档属性中的标记判断）"""
+    file_name = os.path.basename(file_path)
+    return (os.path.splitext(file_name)[0].endswith(OUTPUT_SUFFIXES)
+            or file_name.startswith(CONSOLIDATED_PREFIX) or is_consolidated_workbook(file_path))
+
+
+def get_output_file(file_path, edit_in_place=False):
+    """根据是否在原文件上操作，返回输出文件路径；.xls文件不能直接修改，总是另存为.xlsx"""
+    if edit_in_place and not is_xls(file_path):
+        return file_path
+    output_dir = os.path.dirname(file_path)
+    file_name, file_ext = os.path.splitext(os.path.basename(file_path))
+    if is_xls(file_path):
+        file_ext = ".xlsx"
+    return os.path.join(output_dir, f"{file_name}_分类{file_ext}")
+
+
+def get_confirmation_file(file_path):
+    """流式处理模式下只保存确认函的输出文件路径"""
+    output_dir = os.path.dirname(file_path)
+    file_name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(output_dir, f"{file_name}_确认函.xlsx")
+
+
+def _new_result(file_path):
+    """创建单个文件的处理结果"""
+    return {
+        "file": file_path,
+        "success": False,
+        "output_file": None,
+        "rows": 0,
+        "untaxed": 0.0,
+        "tax": 0.0,
+        "total": 0.0,
+        "elapsed": 0.0,
+        "error": None,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "supplier": None,
+        "categories": None,
+        "skipped": False,
+    }
+
+
+def process_statement(file_path, edit_in_place=False, log=print, streaming=False, rule_set=None, cache=None,
+                      profile=False, config=None, sidecar=False):
+    """
+    处理单个对账单文件：分类标记、创建确认函sheet并保存，不依赖Tk界面
+
+    streaming=True 时以只读流式方式处理超大文件，内存占用与行数无关，
+    只生成单独的确认函文件，不写入品类标记列。
+    rule_set 为编译后的分类规则表，默认使用程序目录下rules.txt中的规则；
+    cache 为分类缓存，批量处理时传入同一个缓存，各文件共用已分类的M列取值（此时使用缓存的规则表）。
+    profile=True 时记录各阶段的耗时、CPU时间和内存峰值，输出到日志并保存在结果的"profile"中。
+    config 为确认函中的酒店信息（srct_config.HotelConfig），默认使用对账单所在文件夹或程序目录下的config.txt。
+    sidecar=True 时使用解析结果缓存（srct_sidecar，需要pyarrow）：处理并保存后将分类和汇总用到的列保存为
+    Parquet文件（流式处理时在逐行读取的同时收集），流式处理时对账单内容与缓存一致则直接读取缓存，不再解析Excel文件。
+    返回结果字典，包含是否成功、输出文件、数据行数、未税/税额/总金额、耗时和错误信息，
+    成功时还包含供应商名称和各品类在员餐/非员餐下的金额（见_set_success）
+    """
+    start_time = time.perf_counter()
+    result = _new_result(file_path)
+    profiler = StageProfiler(enabled=profile)
+    profiler.start()
+    try:
+        if cache is None:
+            cache = ClassificationCache(rule_set)
+        rule_set = cache.rule_set
+        if config is None:
+            config = get_file_config(file_path, log)
+        
+        # 检查文件是否存在
+        if not os.path.exists(file_path):
+            log("警告：文件不存在")
+            result["error"] = "选择的文件不存在"
+            return result
+        
+        if edit_in_place and is_xls(file_path) and not streaming:
+            log("旧版.xls文件无法直接修改，将另存为.xlsx文件")
+            edit_in_place = False
+        
+        if streaming:
+            return _process_streaming(file_path, result, log, cache, profiler, config, sidecar)
+        
+        # 读取Excel文件
+        log("读取Excel文件...")
+        try:
+            # 表头在第6行；只解析一次文件，同时得到表格数据和用于保存的工作簿
+            with profiler.stage("read"):
+                df, wb = load_statement(file_path)
+            log(f"成功读取文件，共 {len(df)} 行数据")
+            result["rows"] = len(df)
+        except Exception as e:
+            log(f"警告：读取Excel文件失败: {str(e)}")
+            result["error"] = f"无法读取Excel文件:\n{str(e)}"
+            return result
+        
+        # 检查是否存在M列（Excel中的第13列）
+        if len(df.columns) < 13:  # 假设M列是第13列（索引为12）
+            log("警告：文件中没有足够的列，无法找到M列")
+            result["error"] = "文件中没有足够的列，无法找到M列"
+            return result
+        
+        # 获取M列的列名和数据
+        m_column_name = df.columns[12]  # 索引为12的列（M列）
+        log(f"找到M列: {m_column_name}")
+        
+        # 添加新列用于存储分类结果（在M列旁边）
+        classification_column = CLASSIFICATION_COLUMN
+        
+        # 进行分类标记（按M列不同取值一次性分类整列）
+        hits, misses = cache.hits, cache.misses
+        with profiler.stage("classify"):
+            df.insert(13, classification_column, classify_series(df[m_column_name], cache=cache))  # 在M列后插入新列，M列为空的行保持为空
+        _log_cache_usage(result, cache, hits, misses, log)
+        
+        # 一次分组汇总各品类在员餐/非员餐下的金额和数量，确认函和统计日志都使用该汇总表
+        with profiler.stage("aggregate"):
+            summary, group_rows = summarize_by_category(df, classification_column, rule_set.categories)
+        
+        # 根据用户选择决定是保存到新文件还是直接修改原文件
+        output_file = get_output_file(file_path, edit_in_place)
+        if edit_in_place:
+            log("将直接在原文件上操作...")
+        else:
+            log("正在保存到新文件...")
+        
+        supplier = None
+        try:
+            # 尝试使用openpyxl保存，保留原始格式
+            # 使用读取时已加载的原始工作簿以保留格式
+            try:
+                if wb is None:
+                    raise ValueError("无法使用openpyxl打开该文件格式")
+                with profiler.stage("write_sheet"):
+                    ws = wb.active
+                    
+                    # 添加新列标题
+                    header_row = 6  # 表头在第6行
+                    ws.cell(row=header_row, column=14, value=classification_column)
+                    
+                    # 批量写入分类结果（数据从表头下一行开始）
+                    write_column(ws, 14, header_row + 1, df[classification_column].tolist())
+                    
+                    # 创建供应商对账确认函sheet
+                    supplier = write_confirmation_sheet(wb, summary, file_path, log, config=config)
+                
+                # 保存文件
+                with profiler.stage("save"):
+                    wb.save(output_file)
+                if edit_in_place:
+                    log(f"已保留原始格式直接修改原文件")
+                else:
+                    log(f"已保留原始格式保存文件到: {output_file}")
+                log(f"已创建供应商对账确认函sheet")
+            except Exception as e:
+                log(f"保留格式保存失败，将使用标准方式保存: {str(e)}")
+                # 如果上面的方法失败，使用pandas直接保存
+                with profiler.stage("save_standard"), pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+                    df.to_excel(writer, index=False)
+                if edit_in_place:
+                    log(f"已使用标准方式直接修改原文件")
+                else:
+                    log(f"已使用标准方式保存文件到: {output_file}")
+        except Exception as e:
+            log(f"保存文件时出错: {str(e)}")
+            result["error"] = f"保存文件时出错: {str(e)}"
+            return result
+        
+        if edit_in_place:
+            log(f"分类完成，已直接修改原文件")
+            log(f"文件路径: {output_file}")
+        else:
+            log(f"分类完成，文件已保存")
+            log(f"文件路径: {output_file}")
+        
+        # 输出分类统计结果
+        log_category_summary(summary, group_rows, log)
+        
+        # 保存解析结果缓存（记录保存后的文件内容，直接在原文件上操作时缓存与修改后的原文件对应）
+        if sidecar and wb is not None:
+            with profiler.stage("save_sidecar"):
+                save_sidecar(file_path, df, m_column_name, df[classification_column], rule_set.version, wb, log)
+        
+        _set_success(result, summary, output_file, supplier)
+        return result
+    
+    except Exception as e:
+        log(f"处理文件时出错: {str(e)}")
+        result["error"] = f"处理文件时出错: {str(e)}"
+        return result
+    finally:
+        result["elapsed"] = round(time.perf_counter() - start_time, 3)
+        if profile:
+            result["profile"] = profiler.finish()
+            for line in format_profile(result["profile"]):
+                log(line)
+
+
+def _process_streaming(file_path, result, log, cache, profiler, config, sidecar=False):
+    """
+    流式处理超大文件：逐行累计汇总后只生成确认函文件
+
+    sidecar=True 时有与对账单一致的解析结果缓存则从缓存汇总，否则流式读取时收集缓存需要的列，保存确认函后写入缓存
+    """
+    columns = None
+    try:
+        hits, misses = cache.hits, cache.misses
+        cached = None
+        if sidecar:
+            with profiler.stage("read_sidecar"):
+                cached = load_sidecar(file_path, log)
+        if cached is not None:
+            log("对账单未变化，使用解析结果缓存...")
+            with profiler.stage("aggregate"):
+                summary, group_rows, rows, source_wb = cached.summarize(cache)
+        else:
+            log("以流式方式读取Excel文件...")
+            if sidecar:
+                columns = SidecarColumns()
+            # 流式读取时分类和汇总在同一遍扫描中完成，计为一个阶段
+            with profiler.stage("stream_read"):
+                summary, group_rows, rows, source_wb = stream_statement(file_path, cache, log, columns=columns)
+        log(f"成功读取文件，共 {rows} 行数据")
+        result["rows"] = rows
+        _log_cache_usage(result, cache, hits, misses, log)
+    except Exception as e:
+        log(f"警告：读取Excel文件失败: {str(e)}")
+        result["error"] = f"无法读取Excel文件:\n{str(e)}"
+        return result
+    
+    output_file = get_confirmation_file(file_path)
+    log("流式处理模式不修改原文件，不写入品类标记列，确认函将保存到新文件...")
+    try:
+        with profiler.stage("write_sheet"):
+            wb = Workbook()
+            wb.remove(wb.active)
+            supplier = write_confirmation_sheet(wb, summary, file_path, log, source_wb=source_wb, config=config)
+        with profiler.stage("save"):
+            wb.save(output_file)
+        log(f"已保存确认函到: {output_file}")
+        if columns is not None:
+            with profiler.stage("save_sidecar"):
+                columns.save(file_path, cache.rule_set.version, source_wb, log)
+    except Exception as e:
+        log(f"保存文件时出错: {str(e)}")
+        result["error"] = f"保存文件时出错: {str(e)}"
+        return result
+    finally:
+        source_wb.close()
+    
+    log_category_summary(summary, group_rows, log)
+    _set_success(result, summary, output_file, supplier)
+    return result
+
+
+def _log_cache_usage(result, cache, hits, misses, log):
+    """记录并输出本文件分类时的缓存命中次数（hits/misses为分类前的计数）"""
+    result["cache_hits"] = cache.hits - hits
+    result["cache_misses"] = cache.misses - misses
+    log(f"分类缓存：命中 {result['cache_hits']} 次，未命中 {result['cache_misses']} 次")
+
+
+def _set_success(result, summary, output_file, supplier=None):
+    """
+    记录处理成功的结果和总金额
+
+    供应商名称取自L7单元格，没有时取自文件名；categories 为
+    {品类: {员餐/非员餐: {不含税金额: 金额, 税费: 金额}}}，用于生成多供应商汇总表
+    """
+    totals = summary.sum()
+    total_untaxed = totals[(EMPLOYEE_GROUP, UNTAXED)] + totals[(OTHER_GROUP, UNTAXED)]
+    total_tax = totals[(EMPLOYEE_GROUP, TAX)] + totals[(OTHER_GROUP, TAX)]
+    
+    result["success"] = True
+    result["output_file"] = output_file
+    result["untaxed"] = float(total_untaxed)
+    result["tax"] = float(total_tax)
+    result["total"] = float(total_untaxed + total_tax)
+    result["supplier"] = str(supplier) if supplier else supplier_from_file_name(result["file"])
+    result["categories"] = {
+        category: {
+            group_name: {UNTAXED: float(row[(group_name, UNTAXED)]), TAX: float(row[(group_name, TAX)])}
+            for group_name in (EMPLOYEE_GROUP, OTHER_GROUP)
+        }
+        for category, row in summary.iterrows()
+    }
+
+
+def log_category_summary(summary, group_rows, log=print):
+    """按员工餐厅和其他餐厅（营业点）输出各分类的数量和金额统计"""
+    log("\n分类统计结果:")
+    totals = summary.sum()
+    
+    sections = [
+        (EMPLOYEE_GROUP, "员工餐厅"),
+        (OTHER_GROUP, "其他餐厅（营业点）"),
+    ]
+    for group_name, title in sections:
+        log(f"\n{title}:")
+        group_items = group_rows[group_name]
+        
+        for category in summary.index:
+            count = summary.at[category, (group_name, COUNT)]
+            untaxed_amount = summary.at[category, (group_name, UNTAXED)]
+            tax_amount = summary.at[category, (group_name, TAX)]
+            total_amount = untaxed_amount + tax_amount
+            
+            # 输出统计信息
+            percentage = (count / group_items) * 100 if group_items > 0 else 0
+            log(f"{category}: {count}项 ({percentage:.1f}%)")
+            log(f"  未税金额: {untaxed_amount:.2f}")
+            log(f"  税额: {tax_amount:.2f}")
+            log(f"  总金额: {total_amount:.2f}")
+        
+        # 小计
+        group_untaxed = totals[(group_name, UNTAXED)]
+        group_tax = totals[(group_name, TAX)]
+        log(f"\n{title}小计:")
+        log(f"未税金额: {group_untaxed:.2f}")
+        log(f"税额: {group_tax:.2f}")
+        log(f"总金额: {(group_untaxed + group_tax):.2f}")
+    
+    # 输出总计信息
+    total_untaxed = totals[(EMPLOYEE_GROUP, UNTAXED)] + totals[(OTHER_GROUP, UNTAXED)]
+    total_tax = totals[(EMPLOYEE_GROUP, TAX)] + totals[(OTHER_GROUP, TAX)]
+    
+    log("\n总计:")
+    log(f"未税金额: {total_untaxed:.2f}")
+    log(f"税额: {total_tax:.2f}")
+    log(f"总应付金额: {(total_untaxed + total_tax):.2f}")
+
+
+# 工作进程内共用的分类缓存，由_init_worker初始化
+_worker_cache = None
+
+
+def _init_worker(version, labels):
+    """工作进程初始化：使用主进程缓存中已有的分类结果（规则表版本一致时）"""
+    global _worker_cache
+    _worker_cache = ClassificationCache()
+    if _worker_cache.rule_set.version == version:
+        _worker_cache.labels.update(labels)
+
+
+def _process_in_worker(file_path, edit_in_place, streaming=False, cache=None, profile=False, config=None,
+                       sidecar=False):
+    """在工作进程中处理单个文件，日志和新增的分类缓存项随结果一起返回"""
+    if cache is None:
+        if _worker_cache is None:
+            _init_worker(None, {})
+        cache = _worker_cache
+    cache.added = {}
+    log_lines = []
+    result = process_statement(file_path, edit_in_place, log=log_lines.append, streaming=streaming, cache=cache,
+                               profile=profile, config=config, sidecar=sidecar)
+    result["log"] = log_lines
+    result["cache_labels"] = cache.added
+    return result
+
+
+def process_batch(file_paths, workers=1, edit_in_place=False, on_result=None, streaming=False, cache=None,
+                  profile=False, build=None, config=None, log=print, sidecar=False):
+    """
+    批量处理多个文件，workers大于1时使用多进程并行处理
+
+    所有文件共用分类缓存cache（默认新建），多进程时各进程新增的缓存项合并回cache。
+    profile=True 时每个文件的结果中包含各阶段的性能记录（"profile"）。
+    build 为srct_manifest.IncrementalBuild时跳过上次处理后没有变化的文件（结果中skipped为True），
+    并记录本次的处理结果，由调用方保存。
+    config 为所有文件使用的酒店信息；默认每个文件使用所在文件夹或程序目录下的config.txt，
+    开始处理前在主进程中读取和校验（每个config.txt只读取一次，警告输出到log），再传给各文件。
+    sidecar=True 时各文件使用解析结果缓存（见process_statement）。
+    每个文件处理完成后调用on_result(result)，返回按输入顺序排列的结果列表
+    """
+    if cache is None:
+        cache = ClassificationCache()
+    
+    results = {}
+    pending = []
+    for file_path in file_paths:
+        recorded = build.up_to_date(file_path) if build is not None else None
+        if recorded is None:
+            pending.append(file_path)
+            continue
+        results[file_path] = recorded
+        if on_result:
+            on_result(recorded)
+    
+    configs = {file_path: config if config is not None else get_file_config(file_path, log) for file_path in pending}
+    
+    if workers <= 1 or len(pending) <= 1:
+        for file_path in pending:
+            results[file_path] = _process_in_worker(file_path, edit_in_place, streaming, cache, profile,
+                                                    configs[file_path], sidecar)
+            del results[file_path]["cache_labels"]
+            if build is not None:
+                build.record(results[file_path])
+            if on_result:
+                on_result(results[file_path])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cache.rule_set.version, cache.labels)) as executor:
+            futures = {executor.submit(_process_in_worker, file_path, edit_in_place, streaming, None, profile,
+                                       configs[file_path], sidecar): file_path
+                       for file_path in pending}
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 工作进程异常退出时记录为失败
+                    result = _new_result(file_path)
+                    result["error"] = f"工作进程出错: {str(e)}"
+                    result["log"] = []
+                    result["cache_labels"] = {}
+                cache.merge(result.pop("cache_labels"), result["cache_hits"], result["cache_misses"])
+                results[file_path] = result
+                if build is not None:
+                    build.record(result)
+                if on_result:
+                    on_result(result)
+    return [results[file_path] for file_path in file_paths]
@@ -0,0 +1,118 @@
+import csv
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# 写入CSV跟踪文件的列
+TRACE_COLUMNS = ["file", "success", "rows", "stage", "wall", "cpu", "peak_memory", "memory_growth"]
+
+
+class StageProfiler:
+    """
+    记录处理一个文件时各阶段的墙钟时间、CPU时间和内存峰值
+
+    内存使用tracemalloc统计Python（含pandas/numpy数据）分配的内存，开启后处理会变慢，
+    因此只在需要分析性能时启用；enabled=False时stage()不做任何记录。
+    peak_memory为阶段内的内存峰值，memory_growth为阶段结束时比开始时多占用的内存（字节）
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+        self._started_tracing = False
+        self._wall = None
+        self._cpu = None
+        self._peak = 0
+
+    def start(self):
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self._peak = max(self._peak, peak)
+            self.stages.append({
+                "stage": name,
+                "wall": round(time.perf_counter() - wall, 4),
+                "cpu": round(time.process_time() - cpu, 4),
+                "peak_memory": peak,
+                "memory_growth": current - start_memory,
+            })
+
+    def finish(self):
+        """结束记录，返回 {'wall', 'cpu', 'peak_memory', 'stages'}；未启用时返回None"""
+        if not self.enabled:
+            return None
+        peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return {
+            "wall": round(time.perf_counter() - self._wall, 4),
+            "cpu": round(time.process_time() - self._cpu, 4),
+            "peak_memory": peak,
+            "stages": self.stages,
+        }
+
+
+def format_memory(size):
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def format_profile(profile):
+    """各阶段耗时和内存的日志行"""
+    lines = ["各阶段耗时和内存："]
+    for stage in profile["stages"]:
+        lines.append(f"  {stage['stage']}: 耗时 {stage['wall']:.3f}s，CPU {stage['cpu']:.3f}s，"
+                     f"内存峰值 {format_memory(stage['peak_memory'])}，增加 {format_memory(stage['memory_growth'])}")
+    lines.append(f"  合计: 耗时 {profile['wall']:.3f}s，CPU {profile['cpu']:.3f}s，"
+                 f"内存峰值 {format_memory(profile['peak_memory'])}")
+    return lines
+
+
+def write_trace(path, results):
+    """
+    将一批文件的处理结果中的性能记录写入跟踪文件，扩展名为.csv时写CSV（每个阶段一行，
+    另有stage为total的整个文件一行），否则写JSON
+    """
+    records = [result for result in results if result.get("profile")]
+    if path.lower().endswith(".csv"):
+        # 带BOM的UTF-8，Excel可以直接打开中文文件名
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=TRACE_COLUMNS)
+            writer.writeheader()
+            for result in records:
+                profile = result["profile"]
+                base = {"file": result["file"], "success": result["success"], "rows": result["rows"]}
+                for stage in profile["stages"]:
+                    writer.writerow({**base, **stage})
+                writer.writerow({**base, "stage": "total", "wall": profile["wall"], "cpu": profile["cpu"],
+                                 "peak_memory": profile["peak_memory"], "memory_growth": ""})
+    else:
+        trace = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "files": [{"file": result["file"], "success": result["success"], "rows": result["rows"],
+                       **result["profile"]} for result in records],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, indent=2)
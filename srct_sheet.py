@@ -0,0 +1,442 @@
+import os
+import re
+from copy import copy
+from datetime import datetime, timedelta
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.worksheet.page import PageMargins
+from srct_config import get_file_config
+from srct_summary import EMPLOYEE_GROUP, OTHER_GROUP, TAX, UNTAXED
+
+
+# 中文大写数字转换函数
+def num_to_chinese(num):
+    """
+    将数字转换为中文大写金额
+    """
+    # 特殊情况处理
+    if num == 0:
+        return '零圆整'
+    
+    num = float(num)
+    integer_part = int(num)
+    decimal_part = int(round((num - integer_part) * 100))
+    
+    chinese_nums = ['零', '壹', '贰', '叁', '肆', '伍', '陆', '柒', '捌', '玖']
+    position_units = ['', '拾', '佰', '仟']  # 个位不添加单位，后面单独处理
+    section_units = ['', '万', '亿', '兆', '京', '垓']
+    
+    # 处理整数部分
+    chinese_str = ''
+    
+    # 特殊情况：整数部分为0
+    if integer_part == 0:
+        chinese_str = '零圆'
+    else:
+        # 将整数部分转换为字符串
+        str_integer = str(integer_part)
+        
+        # 按4位分段，从低位到高位
+        sections = []
+        for i in range(0, len(str_integer), 4):
+            start = max(0, len(str_integer) - i - 4)
+            end = len(str_integer) - i
+            sections.append(str_integer[start:end])
+        
+        # 处理每个分段
+        for section_index, section in enumerate(sections):
+            section_chinese = ''
+            has_value = False  # 标记这一段是否有非零值
+            
+            # 处理每一段内的数字，从高位到低位
+            for i, digit in enumerate(section):
+                position = len(section) - i - 1  # 位置（个、十、百、千）
+                digit_int = int(digit)
+                
+                if digit_int != 0:
+                    # 添加数字和单位
+                    section_chinese += chinese_nums[digit_int] + position_units[position]
+                    has_value = True
+                elif has_value:  # 如果之前有非零值，且当前是零
+                    # 避免多个连续的零
+                    if not section_chinese.endswith('零'):
+                        section_chinese += '零'
+            
+            # 处理末尾的零
+            if section_chinese.endswith('零'):
+                section_chinese = section_chinese[:-1]
+            
+            # 如果这一段有内容，添加万、亿等单位
+            if section_chinese != '':
+                if section_index < len(section_units):
+                    section_chinese += section_units[section_index]
+                chinese_str = section_chinese + chinese_str
+        
+        # 在整数部分的最后添加"圆"字（即个位数后面）
+        chinese_str += '圆'
+    
+    # 处理小数部分
+    if decimal_part > 0:
+        jiao = decimal_part // 10
+        fen = decimal_part % 10
+        
+        if jiao > 0:
+            chinese_str += chinese_nums[jiao] + '角'
+        if fen > 0:
+            chinese_str += chinese_nums[fen] + '分'
+    else:
+        # 只有在没有小数部分时才添加"整"字
+        chinese_str += '整'
+    
+    # 确保结果不为空
+    if not chinese_str:
+        chinese_str = '零圆整'
+    
+    return chinese_str
+
+
+def read_supplier_name(source_wb, log=print):
+    """读取Statement Sheet（没有时为第一个工作表）L7单元格中的供应商名称，没有数据时返回空值"""
+    ws = source_wb.active
+    supplier_name = ""
+    try:
+        # 检查是否存在名为"Statement Sheet"的工作表
+        if "Statement Sheet" in source_wb.sheetnames:
+            statement_sheet = source_wb["Statement Sheet"]
+            supplier_name = statement_sheet.cell(row=7, column=12).value  # L列是第12列
+            if supplier_name:
+                log(f"从Statement Sheet的L7单元格读取到供应商名称: {supplier_name}")
+            else:
+                log("Statement Sheet的L7单元格没有数据")
+        else:
+            # 如果没有Statement Sheet，尝试从第一个工作表的L7单元格读取
+            supplier_name = ws.cell(row=7, column=12).value  # L列是第12列
+            if supplier_name:
+                log(f"从第一个工作表的L7单元格读取到供应商名称: {supplier_name}")
+            else:
+                log("第一个工作表的L7单元格没有数据")
+    except Exception as e:
+        log(f"读取供应商名称时出错: {str(e)}")
+        supplier_name = ""
+    return supplier_name
+
+
+def supplier_from_file_name(file_path):
+    """从 "2025-06_供应商名称.xlsx" 格式的文件名中提取供应商名称，不符合该格式时返回不含扩展名的文件名"""
+    file_name = os.path.basename(file_path)
+    match = re.match(r'(\d{4}-\d{2})_(.+?)(_分类|_确认函)?\.xlsx?$', file_name)
+    if match:
+        return match.group(2)
+    return os.path.splitext(file_name)[0]
+
+
+# 确认函的版式：第1~13行为抬头和交易货款信息，第14~15行为表头，第16行起为各品类明细和合计行，
+# 品类多于默认的6个时，备注及以下内容整体下移
+TABLE_HEADER_ROW = 14
+FIRST_CATEGORY_ROW = 16
+DEFAULT_CATEGORY_COUNT = 6
+LAST_COLUMN = 6
+
+# 抬头各行A列的文字
+HEADER_LABELS = [
+    (2, "由酒店（酒店全称）："),
+    (3, "地址："),
+    (4, "财务部联系人："),
+    (5, "致供应商（供应商全称）："),
+    (6, "税务登记号码："),
+    (7, "对账联系人："),
+    (8, "经酒店与供应商共同核对，确认产生如下交易货款："),
+    (9, "➢ 含税总金额人民币大写："),
+    (10, "➢ 不含税金额："),
+    (11, "➢ 增值税税款："),
+    (12, "货款所属期间："),
+    (13, "明细对账信息如下："),
+]
+
+REMARKS = [
+    "1. 品类根据供应商实际送货的情况填写，不适用的可留空",
+    "2. 员餐货款的不含税金额，如零税率，酒店需要根据实际收货记录的总金额去换算含税及不含税填写",
+    "3. 本函由双方核对原始收货单据后填写，供应商当月供货数据与酒店当月应付账款金额一致",
+    "4. 供应商根据核对后确认的金额开具相关增值税发票给酒店",
+    "5. 请供应商在确认后，需加盖公章或财务专用章，扫描后邮件回传酒店做存档",
+    "6. 建议随确认函发送增值税发票号和发票金额以及发票复印件",
+    "7. 电子邮件发送至：",
+    "8. 本函请在收到后 2 个工作日内返回",
+    "9. 扫描件需清晰显示：金额、盖章、日期三要素，模糊文件视为无效"
+]
+# 第7条备注的B至F列填写邮箱地址
+EMAIL_REMARK_INDEX = 6
+
+COLUMN_WIDTHS = {"A": 28, "B": 15, "C": 12, "D": 12, "E": 12, "F": 20}
+TALL_ROWS = [2, 5, 8, 13]
+
+AMOUNT_FORMAT = '#,##0.00'
+THIN_SIDE = Side(style='thin')
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+DOUBLE_BOTTOM_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=Side(style='double'))
+HEADER_FILL = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
+TOTAL_FILL = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
+LIGHT_FILL = PatternFill(start_color="F5F5F5", end_color="F5F5F5", fill_type="solid")
+CENTER = Alignment(horizontal='center', vertical='center')
+LEFT = Alignment(horizontal='left', vertical='center')
+RIGHT = Alignment(horizontal='right', vertical='center')
+TOTAL_FONT = Font(bold=True, size=12)
+
+# 确认函使用的命名样式 {名称: 样式属性}，每个工作簿只注册一次，各单元格引用样式名称
+SHEET_STYLES = {
+    "确认函标题": dict(font=Font(bold=True, size=16), alignment=CENTER),
+    "确认函表头": dict(font=Font(bold=True), fill=HEADER_FILL, border=THIN_BORDER, alignment=CENTER),
+    "确认函金额表头": dict(font=Font(bold=True), fill=HEADER_FILL, border=THIN_BORDER, alignment=CENTER,
+                      number_format=AMOUNT_FORMAT),
+    "确认函品类": dict(border=THIN_BORDER, alignment=LEFT),
+    "确认函金额": dict(border=THIN_BORDER, alignment=RIGHT, number_format=AMOUNT_FORMAT),
+    "确认函合计品类": dict(font=TOTAL_FONT, fill=TOTAL_FILL, border=THIN_BORDER, alignment=LEFT),
+    "确认函合计金额": dict(font=TOTAL_FONT, fill=TOTAL_FILL, border=THIN_BORDER, alignment=RIGHT,
+                      number_format=AMOUNT_FORMAT),
+    "确认函合计总额": dict(font=TOTAL_FONT, fill=TOTAL_FILL, border=DOUBLE_BOTTOM_BORDER, alignment=RIGHT,
+                      number_format=AMOUNT_FORMAT),
+    "确认函备注标题": dict(font=Font(bold=True)),
+    "确认函备注": dict(font=Font(size=11), alignment=Alignment(horizontal='left', vertical='center', wrap_text=True)),
+    "确认函日期": dict(font=Font(size=11), alignment=LEFT),
+    "确认函盖章": dict(font=Font(size=13, underline="single"), alignment=CENTER),
+}
+# 浅色底纹的单元格使用对应样式加底纹的命名样式，名称为 原样式名 + 后缀（原来没有样式时为"确认函底纹"）
+SHADED_SUFFIX = "底纹"
+
+
+def _named_style(wb, name, registered):
+    """返回样式名称，工作簿中还没有该命名样式时先注册；registered 为已注册的名称集合"""
+    if name not in registered:
+        if name.endswith(SHADED_SUFFIX) and name[:-len(SHADED_SUFFIX)] in SHEET_STYLES:
+            attributes = dict(SHEET_STYLES[name[:-len(SHADED_SUFFIX)]], fill=LIGHT_FILL)
+        elif name in SHEET_STYLES:
+            attributes = SHEET_STYLES[name]
+        else:
+            attributes = dict(fill=LIGHT_FILL)
+        # 没有指定字体和边框的样式使用工作簿的默认字体和边框，与未设置样式的单元格一致
+        attributes = dict({"font": copy(wb._fonts[0]), "border": copy(wb._borders[0])}, **attributes)
+        wb.add_named_style(NamedStyle(name=name, **attributes))
+        registered.add(name)
+    return name
+
+
+def _shaded_rows(category_count, last_row):
+    """
+    加浅色底纹的行：沿用原确认函的底纹位置（按品类数从第5行和第8+品类数行起隔行），
+    第2~12行和表头两行不加底纹
+    """
+    rows = set()
+    for i in range(1, category_count, 2):
+        rows.add(5 + i)
+        rows.add(8 + category_count + i)
+    return sorted(row for row in rows if row <= last_row and not 2 <= row <= 12
+                  and row not in (TABLE_HEADER_ROW, TABLE_HEADER_ROW + 1))
+
+
+def statement_period(source_wb, file_path):
+    """
+    货款所属期间，如"2025年6月1日至2025年6月30日"
+
+    年月依次取自Statement Sheet A列前10行、"2025-06_供应商.xlsx"格式的文件名和当前年月
+    """
+    year_month = ""
+    # 检查是否存在名为"Statement Sheet"的工作表
+    if "Statement Sheet" in source_wb.sheetnames:
+        statement_sheet = source_wb["Statement Sheet"]
+        # 尝试从A列获取年月数据（通常在A1或其他位置）
+        for row in range(1, 10):  # 检查前10行
+            cell_value = statement_sheet.cell(row=row, column=1).value
+            if cell_value and isinstance(cell_value, str) and re.search(r'\d{4}[-年]\d{1,2}', cell_value):
+                year_month = cell_value
+                break
+    
+    # 如果没有找到年月数据，尝试从文件名获取
+    if not year_month:
+        file_name = os.path.basename(file_path)
+        match = re.match(r'(\d{4}-\d{2})_(.+?)(_分类)?\.xlsx?', file_name)
+        if match:
+            year_month = match.group(1)
+    
+    # 如果仍然没有找到年月数据，使用当前年月
+    if not year_month:
+        now = datetime.now()
+        year_month = now.strftime('%Y-%m')
+    
+    # 解析年月数据
+    if '-' in year_month:
+        year, month = year_month.split('-')
+    elif '年' in year_month:
+        match = re.search(r'(\d{4})年(\d{1,2})', year_month)
+        if match:
+            year, month = match.group(1), match.group(2)
+        else:
+            raise ValueError(f"无法解析年月格式: {year_month}")
+    else:
+        raise ValueError(f"无法解析年月格式: {year_month}")
+    
+    # 获取月份的最后一天
+    if int(month) == 12:
+        next_month = datetime(int(year) + 1, 1, 1)
+    else:
+        next_month = datetime(int(year), int(month) + 1, 1)
+    
+    last_day = (next_month - timedelta(days=1)).day
+    
+    # 格式化为"2025年6月1日至2025年6月30日"格式
+    return f"{year}年{month}月1日至{year}年{month}月{last_day}日"
+
+
+def write_confirmation_sheet(wb, summary, file_path, log=print, source_wb=None, config=None):
+    """
+    在工作簿中创建"确认函"sheet，填写酒店信息、供应商信息和明细对账信息
+
+    summary 为 srct_summary.summarize_by_category 返回的品类汇总表；
+    source_wb 为读取供应商名称和年月的原始工作簿，默认与wb相同；
+    config 为酒店信息（srct_config.HotelConfig），默认使用对账单对应的config.txt（见srct_config.config_path_for）。
+    先按版式确定每个单元格的值和命名样式，合并单元格后逐个单元格写入一次。
+    返回从L7单元格读取的供应商名称（没有数据时为空值）
+    """
+    if source_wb is None:
+        source_wb = wb
+    
+    # 读取Statement Sheet中的L7单元格数据（供应商名称）
+    supplier_name = read_supplier_name(source_wb, log)
+    if config is None:
+        config = get_file_config(file_path, log)
+    
+    # {(行, 列): (值, 样式名称)}，值为None时只设置样式
+    cells = {}
+    
+    def put(row, column, value=None, style=None):
+        cells[(row, column)] = (value, style)
+    
+    # 标题和抬头
+    put(1, 1, "供应商对账确认函", "确认函标题")
+    for row, label in HEADER_LABELS:
+        put(row, 1, label)
+    put(2, 2, config.hotel_name)
+    put(3, 2, config.address)
+    put(4, 2, config.contact)
+    # 将从Statement Sheet读取的供应商名称写入B5单元格
+    put(5, 2, supplier_name)
+    
+    # 明细表头
+    put(TABLE_HEADER_ROW, 1, "品类")
+    put(TABLE_HEADER_ROW, 2, "员餐")
+    put(TABLE_HEADER_ROW, 4, "其他餐饮点 - 非员餐")
+    put(TABLE_HEADER_ROW, 6, "当月总应付账款金额")
+    for column, title in zip(range(2, 6), ["不含税金额", "税费", "不含税金额", "税费"]):
+        put(TABLE_HEADER_ROW + 1, column, title)
+    for row in (TABLE_HEADER_ROW, TABLE_HEADER_ROW + 1):
+        for column in range(1, LAST_COLUMN + 1):
+            value = cells.get((row, column), (None, None))[0]
+            put(row, column, value, "确认函金额表头" if 2 <= column <= 4 else "确认函表头")
+    
+    # 各品类的明细行，金额为0时显示"-"
+    row_idx = FIRST_CATEGORY_ROW
+    for category, row in summary.iterrows():
+        amounts = [row[(EMPLOYEE_GROUP, UNTAXED)], row[(EMPLOYEE_GROUP, TAX)],
+                   row[(OTHER_GROUP, UNTAXED)], row[(OTHER_GROUP, TAX)]]
+        # 计算当月总应付账款金额
+        amounts.append(amounts[0] + amounts[1] + amounts[2] + amounts[3])
+        put(row_idx, 1, category, "确认函品类")
+        for column, amount in enumerate(amounts, 2):
+            put(row_idx, column, "-" if amount == 0 else amount, "确认函金额")
+        row_idx += 1
+    
+    # 合计行：各分组的不含税金额和税费合计
+    totals = summary.sum()
+    total_employee_untaxed = totals[(EMPLOYEE_GROUP, UNTAXED)]
+    total_employee_tax = totals[(EMPLOYEE_GROUP, TAX)]
+    total_other_untaxed = totals[(OTHER_GROUP, UNTAXED)]
+    total_other_tax = totals[(OTHER_GROUP, TAX)]
+    total_amount = total_employee_untaxed + total_employee_tax + total_other_untaxed + total_other_tax
+    put(row_idx, 1, "合计", "确认函合计品类")
+    for column, amount in enumerate([total_employee_untaxed, total_employee_tax, total_other_untaxed,
+                                     total_other_tax, total_amount], 2):
+        put(row_idx, column, "-" if amount == 0 else amount, "确认函合计金额" if column <= 4 else "确认函合计总额")
+    
+    # 含税总金额转换为中文大写写入B9单元格
+    try:
+        # 转换为中文大写（函数内部已添加"圆"字）
+        chinese_amount = num_to_chinese(total_amount)
+        put(9, 2, f"{chinese_amount}（{total_amount:.2f}元）")
+        log(f"已将总金额 {total_amount} 转换为大写 {chinese_amount} 并写入B9单元格")
+    except Exception as e:
+        log(f"转换总金额为中文大写时出错: {str(e)}")
+        # 如果出错，直接写入原始值
+        put(9, 2, f"{total_amount:.2f}元")
+    
+    # 不含税金额和税额写入B10和B11单元格，前面加上"小写"，后面加上"元"
+    total_untaxed = total_employee_untaxed + total_other_untaxed
+    total_tax = total_employee_tax + total_other_tax
+    put(10, 2, f"小写{total_untaxed:.2f}元")
+    log(f"已将未税总金额 {total_untaxed} 写入B10单元格")
+    put(11, 2, f"小写{total_tax:.2f}元")
+    log(f"已将税额总金额 {total_tax} 写入B11单元格")
+    
+    # 读取Statement sheet中的A列年月数据并转换格式写入B12单元格
+    try:
+        formatted_date = statement_period(source_wb, file_path)
+        put(12, 2, formatted_date)
+        log(f"已将年月数据转换为 {formatted_date} 并写入B12单元格")
+    except Exception as e:
+        log(f"读取年月数据并转换格式写入B12单元格时出错: {str(e)}")
+    
+    # 备注、邮箱地址、供应商确认日期和盖章确认
+    offset = max(0, len(summary.index) - DEFAULT_CATEGORY_COUNT)
+    remark_row = 25 + offset
+    email_row = remark_row + 1 + EMAIL_REMARK_INDEX
+    date_row = 36 + offset
+    stamp_row = 39 + offset
+    put(remark_row, 1, "备注：", "确认函备注标题")
+    for i, remark in enumerate(REMARKS):
+        put(remark_row + 1 + i, 1, remark, "确认函备注")
+    put(email_row, 2, config.email, "确认函备注")
+    put(date_row, 1, "供应商确认日期：_______年_______月_______日", "确认函日期")
+    put(stamp_row, 1, "供应商盖章确认", "确认函盖章")
+    
+    # 浅色底纹只加在A至D列
+    for row in _shaded_rows(len(summary.index), stamp_row):
+        for column in range(1, 5):
+            value, style = cells.get((row, column), (None, None))
+            put(row, column, value, f"{style}{SHADED_SUFFIX}" if style else f"确认函{SHADED_SUFFIX}")
+    
+    # 创建确认函sheet（已有"汇总"sheet时在其上生成）
+    if "汇总" not in wb.sheetnames:
+        summary_sheet = wb.create_sheet(title="汇总")
+    else:
+        summary_sheet = wb["汇总"]
+    
+    # 设置页面边距和页眉页脚（单位：厘米）
+    summary_sheet.page_margins = PageMargins(top=0.5/2.54, left=1.5/2.54, right=0.5/2.54, bottom=0.5/2.54, header=0, footer=0)
+    summary_sheet.page_setup.horizontalCentered = True
+    
+    # 先合并单元格，再写入各单元格（合并会重置被合并的单元格）
+    merged_rows = [1] + [remark_row + i for i in range(len(REMARKS) + 1) if remark_row + i != email_row]
+    for row in merged_rows + [date_row, stamp_row]:
+        summary_sheet.merge_cells(start_row=row, start_column=1, end_row=row, end_column=LAST_COLUMN)
+    for row in list(range(2, 8)) + list(range(9, 14)) + [email_row]:
+        summary_sheet.merge_cells(start_row=row, start_column=2, end_row=row, end_column=LAST_COLUMN)
+    summary_sheet.merge_cells(start_row=TABLE_HEADER_ROW, start_column=1, end_row=TABLE_HEADER_ROW + 1, end_column=1)
+    summary_sheet.merge_cells(start_row=TABLE_HEADER_ROW, start_column=2, end_row=TABLE_HEADER_ROW, end_column=3)
+    summary_sheet.merge_cells(start_row=TABLE_HEADER_ROW, start_column=4, end_row=TABLE_HEADER_ROW, end_column=5)
+    summary_sheet.merge_cells(start_row=TABLE_HEADER_ROW, start_column=6, end_row=TABLE_HEADER_ROW + 1, end_column=6)
+    
+    registered = set(wb.named_styles)
+    for (row, column), (value, style) in cells.items():
+        cell = summary_sheet.cell(row=row, column=column)
+        if value is not None:
+            cell.value = value
+        if style:
+            cell.style = _named_style(wb, style, registered)
+    
+    for column, width in COLUMN_WIDTHS.items():
+        summary_sheet.column_dimensions[column].width = width
+    for row in TALL_ROWS:
+        summary_sheet.row_dimensions[row].height = 30
+    
+    # 将"汇总"sheet更名为"确认函"
+    summary_sheet.title = "确认函"
+    log(f"已将汇总sheet更名为确认函")
+    
+    return supplier_name
@@ -0,0 +1,226 @@
+import json
+import os
+
+import pandas as pd
+from openpyxl import Workbook
+
+from srct_classifier import classify_series
+from srct_manifest import content_hash
+from srct_summary import DEPARTMENT_COLUMN, TAX_COLUMN, UNTAXED_COLUMN, summarize_by_category
+
+# 解析结果缓存保存在对账单所在文件夹的子文件夹中，每个对账单一个Parquet文件
+SIDECAR_DIR = "SRCT_cache"
+SIDECAR_VERSION = 1
+
+# Parquet文件元数据中保存来源文件、分类规则版本和表头信息的键
+METADATA_KEY = b"srct"
+
+# 缓存中M列内容和分类结果的列名，部门和金额列与对账单相同
+M_VALUE_COLUMN = "M列"
+LABEL_COLUMN = "品类标记"
+
+# 确认函用到的单元格：供应商名称（L7）和Statement Sheet A列中的年月（前9行），
+# 见srct_sheet.read_supplier_name和statement_period
+SUPPLIER_ROW, SUPPLIER_COLUMN = 7, 12
+PERIOD_ROWS = 9
+
+
+def _pyarrow():
+    """pyarrow为可选依赖，未安装时返回None"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def sidecar_path(file_path):
+    """对账单的解析结果缓存路径"""
+    folder, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(folder, SIDECAR_DIR, f"{name}.parquet")
+
+
+def sidecar_missing(file_path):
+    """对账单还没有解析结果缓存文件；未安装pyarrow时无法保存缓存，不算缺少"""
+    return _pyarrow() is not None and not os.path.exists(sidecar_path(file_path))
+
+
+class StatementSidecar:
+    """
+    对账单的解析结果缓存：分类和汇总用到的M列、部门、金额列和分类结果，以及确认函用到的表头单元格
+
+    对账单导出后不再变化，内容哈希与缓存一致时直接使用缓存生成汇总和确认函，不再解析Excel文件
+    """
+
+    def __init__(self, frame, metadata):
+        self.frame = frame
+        self.metadata = metadata
+
+    def labels(self, cache):
+        """分类结果；分类规则变化时用缓存中的M列内容重新分类"""
+        if self.metadata["rules"] == cache.rule_set.version:
+            return self.frame[LABEL_COLUMN]
+        return classify_series(self.frame[M_VALUE_COLUMN], cache=cache)
+
+    def summarize(self, cache):
+        """返回 (summary, group_rows, rows, source_wb)，与srct_streaming.stream_statement相同（合计方式也相同）"""
+        frame = self.frame.assign(**{LABEL_COLUMN: self.labels(cache)})
+        summary, group_rows = summarize_by_category(frame, LABEL_COLUMN, cache.rule_set.categories, exact=True)
+        return summary, group_rows, len(frame), self.source_workbook()
+
+    def source_workbook(self):
+        """只含供应商名称和年月单元格的工作簿，代替对账单用于生成确认函"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = self.metadata["sheet"]
+        ws.cell(row=SUPPLIER_ROW, column=SUPPLIER_COLUMN, value=self.metadata["supplier"])
+        for row, value in enumerate(self.metadata["period_cells"], 1):
+            ws.cell(row=row, column=1, value=value)
+        return wb
+
+
+class SidecarColumns:
+    """
+    流式处理时逐行收集解析结果缓存需要的列（不保留其他列），处理完成后保存为缓存
+
+    内存占用随行数增加，但远小于读取整个工作表。金额与CategoryAccumulator一致：
+    不是数字的值记为空，汇总时按0处理
+    """
+
+    def __init__(self):
+        self.m_values = []
+        self.departments = []
+        self.untaxed = []
+        self.tax = []
+        self.labels = []
+
+    def add(self, m_value, department, untaxed, tax, label):
+        """收集一行数据，label 为该行的分类结果"""
+        self.m_values.append(None if m_value is None else str(m_value))
+        self.departments.append(None if department is None else str(department))
+        self.untaxed.append(_amount(untaxed))
+        self.tax.append(_amount(tax))
+        self.labels.append(label)
+
+    def add_empty_rows(self, count):
+        """收集中间的空行，与按整个工作表读取时一致"""
+        for values in (self.m_values, self.departments, self.untaxed, self.tax):
+            values.extend([None] * count)
+        self.labels.extend([""] * count)
+
+    def save(self, file_path, rules_version, source_wb, log=print):
+        """保存为对账单的解析结果缓存（见save_sidecar）"""
+        frame = pd.DataFrame({
+            M_VALUE_COLUMN: pd.Series(self.m_values, dtype=object),
+            DEPARTMENT_COLUMN: pd.Series(self.departments, dtype=object),
+            UNTAXED_COLUMN: pd.Series(self.untaxed, dtype="float64"),
+            TAX_COLUMN: pd.Series(self.tax, dtype="float64"),
+        })
+        labels = pd.Series(self.labels, dtype=object)
+        return save_sidecar(file_path, frame, M_VALUE_COLUMN, labels, rules_version, source_wb, log)
+
+
+def _amount(value):
+    """数字原样返回，空值和非数字返回None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _source_matches(file_path, metadata):
+    """对账单内容与缓存记录的是否一致，文件大小和修改时间一致时不重新计算哈希"""
+    stat = os.stat(file_path)
+    if [stat.st_size, stat.st_mtime_ns] == [metadata.get("size"), metadata.get("mtime_ns")]:
+        return True
+    return content_hash(file_path) == metadata.get("hash")
+
+
+def load_sidecar(file_path, log=print):
+    """读取对账单的解析结果缓存，缓存不存在、对账单已变化、无法读取或未安装pyarrow时返回None"""
+    pyarrow = _pyarrow()
+    path = sidecar_path(file_path)
+    if pyarrow is None or not os.path.exists(path):
+        return None
+    try:
+        schema_metadata = pyarrow.parquet.read_schema(path).metadata or {}
+        metadata = json.loads(schema_metadata[METADATA_KEY])
+        if metadata.get("version") != SIDECAR_VERSION or not _source_matches(file_path, metadata):
+            return None
+        frame = pyarrow.parquet.read_table(path).to_pandas()
+    except Exception as e:
+        log(f"警告：读取解析缓存失败，将重新读取对账单: {str(e)}")
+        return None
+    return StatementSidecar(frame, metadata)
+
+
+def _text_column(values):
+    """与分类时一致：非空值转换为字符串，空值保持为空"""
+    return values.where(values.isna(), values.astype(str))
+
+
+def _header_cells(source_wb):
+    """读取确认函用到的表头单元格，取法与srct_sheet.read_supplier_name和statement_period相同"""
+    if "Statement Sheet" in source_wb.sheetnames:
+        ws = source_wb["Statement Sheet"]
+        period_cells = [ws.cell(row=row, column=1).value for row in range(1, PERIOD_ROWS + 1)]
+    else:
+        ws = source_wb.active
+        period_cells = []
+    return {
+        "sheet": ws.title,
+        "supplier": ws.cell(row=SUPPLIER_ROW, column=SUPPLIER_COLUMN).value,
+        "period_cells": [value if isinstance(value, str) else None for value in period_cells],
+    }
+
+
+def save_sidecar(file_path, df, m_column, labels, rules_version, source_wb, log=print):
+    """
+    保存对账单的解析结果缓存，在对账单处理并保存之后调用（直接在原文件上操作时记录的是处理后的文件内容）；
+    流式处理时由SidecarColumns.save调用
+
+    labels 为分类结果，rules_version 为分类时使用的规则表版本，source_wb 为对账单工作簿。
+    金额列不全是数字或未安装pyarrow时不保存，返回是否保存成功
+    """
+    pyarrow = _pyarrow()
+    if pyarrow is None:
+        log("未安装pyarrow，不保存解析缓存")
+        return False
+    for column in (UNTAXED_COLUMN, TAX_COLUMN):
+        if not pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column]):
+            log(f"警告：{column}列不全是数字，不保存解析缓存")
+            return False
+
+    frame = pd.DataFrame({
+        M_VALUE_COLUMN: _text_column(df[m_column]),
+        DEPARTMENT_COLUMN: _text_column(df[DEPARTMENT_COLUMN]),
+        UNTAXED_COLUMN: df[UNTAXED_COLUMN],
+        TAX_COLUMN: df[TAX_COLUMN],
+        LABEL_COLUMN: labels,
+    })
+    path = sidecar_path(file_path)
+    temp_path = path + ".tmp"
+    try:
+        stat = os.stat(file_path)
+        metadata = {
+            "version": SIDECAR_VERSION,
+            "hash": content_hash(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "rules": rules_version,
+            "m_column": str(m_column),
+            **_header_cells(source_wb),
+        }
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            METADATA_KEY: json.dumps(metadata, ensure_ascii=False, default=str).encode("utf-8"),
+        })
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pyarrow.parquet.write_table(table, temp_path)
+        os.replace(temp_path, path)
+    except Exception as e:
+        log(f"警告：保存解析缓存失败: {str(e)}")
+        return False
+    log(f"已保存解析缓存: {path}")
+    return True
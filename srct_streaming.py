@@ -0,0 +1,88 @@
+from openpyxl import load_workbook
+
+from srct_summary import DEPARTMENT_COLUMN, TAX_COLUMN, UNTAXED_COLUMN, CategoryAccumulator
+from srct_workbook import HEADER_ROW, is_xls, load_xls_workbook
+
+# M列（商品分类）在表格中的列索引（从0开始）
+M_COLUMN_INDEX = 12
+
+# 流式处理时每处理多少行输出一次进度日志
+LOG_EVERY_ROWS = 100000
+
+
+def stream_statement(file_path, cache, log=print, header_row=HEADER_ROW, columns=None):
+    """
+    以只读方式逐行读取对账单，边读取边分类并累计各品类在员餐/非员餐下的金额
+
+    不在内存中保留明细数据，内存占用与行数无关。cache 为分类缓存（ClassificationCache）。
+    返回 (summary, group_rows, rows, source_wb)：汇总结构与 summarize_by_category 相同，
+    rows 为数据行数，source_wb 为只读工作簿，用于读取供应商名称等信息，使用后需调用 close()。
+    columns 为srct_sidecar.SidecarColumns时同时收集解析结果缓存需要的列
+    """
+    if is_xls(file_path):
+        # .xls文件最多65536行，转换为内存中的工作簿后同样逐行累计
+        wb = load_xls_workbook(file_path)
+    else:
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        if wb.read_only:
+            # 只读模式下部分导出文件的尺寸信息不准确，按实际内容读取
+            ws.reset_dimensions()
+
+        header = next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), ())
+        header = list(header)
+        if len(header) <= M_COLUMN_INDEX:
+            raise ValueError("文件中没有足够的列，无法找到M列")
+        log(f"找到M列: {header[M_COLUMN_INDEX]}")
+
+        department_index = _column_index(header, DEPARTMENT_COLUMN)
+        untaxed_index = _column_index(header, UNTAXED_COLUMN)
+        tax_index = _column_index(header, TAX_COLUMN)
+        last_index = max(M_COLUMN_INDEX, department_index, untaxed_index, tax_index)
+
+        accumulator = CategoryAccumulator(cache.rule_set.categories)
+        labels = {}
+        rows = 0
+        pending_empty_rows = 0
+        for values in ws.iter_rows(min_row=header_row + 1, values_only=True):
+            if all(value is None for value in values):
+                # 末尾的空行不计入数据行，中间的空行在遇到下一行数据时再计入
+                pending_empty_rows += 1
+                continue
+            if pending_empty_rows:
+                accumulator.add_empty_rows(pending_empty_rows)
+                if columns is not None:
+                    columns.add_empty_rows(pending_empty_rows)
+                rows += pending_empty_rows
+                pending_empty_rows = 0
+
+            if len(values) <= last_index:
+                values = tuple(values) + (None,) * (last_index + 1 - len(values))
+
+            # 与整列分类一致：每个不同的取值只查询一次分类缓存
+            m_value = values[M_COLUMN_INDEX]
+            label = labels.get(m_value)
+            if label is None:
+                label = labels[m_value] = cache.classify(m_value)
+
+            accumulator.add(label, values[department_index], values[untaxed_index], values[tax_index])
+            if columns is not None:
+                columns.add(m_value, values[department_index], values[untaxed_index], values[tax_index], label)
+            rows += 1
+            if rows % LOG_EVERY_ROWS == 0:
+                log(f"已处理 {rows} 行数据...")
+
+        summary, group_rows = accumulator.result()
+        return summary, group_rows, rows, wb
+    except Exception:
+        wb.close()
+        raise
+
+
+def _column_index(header, column_name):
+    """返回表头中列名所在的列索引，找不到时抛出KeyError"""
+    for index, value in enumerate(header):
+        if value == column_name:
+            return index
+    raise KeyError(column_name)
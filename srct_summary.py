@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# 按用户要求的顺序显示所有分类
+ORDERED_CATEGORIES = ["干货", "海鲜", "酒类", "饮料", "水", "其他"]
+
+# 定义员工餐厅，其余部门均为其他餐厅（营业点）
+EMPLOYEE_RESTAURANTS = ["员工餐厅", "员工食堂"]
+
+# 汇总表的分组（员餐/非员餐）和指标
+EMPLOYEE_GROUP = "员餐"
+OTHER_GROUP = "非员餐"
+UNTAXED = "不含税金额"
+TAX = "税费"
+COUNT = "数量"
+
+# 对账单中使用的列名
+DEPARTMENT_COLUMN = "部门"
+UNTAXED_COLUMN = "小计金额(结算)"
+TAX_COLUMN = "税额(结算)"
+
+
+def summarize_by_category(df, classification_column, categories=ORDERED_CATEGORIES, exact=False):
+    """
+    一次分组汇总各品类在员餐/非员餐下的不含税金额、税费和数量
+
+    exact=True 时与流式处理的 CategoryAccumulator 一致：空值按0处理，用math.fsum求正确舍入的合计
+    （金额列需为数字类型）。
+
+    返回 (table, group_rows)：
+    table 以品类为行（按categories顺序，没有数据的品类为0），
+    列为 (员餐/非员餐, 不含税金额/税费/数量)；
+    group_rows 为员餐/非员餐各自的总行数（包含未标记品类的行）。
+    """
+    group = pd.Series(
+        np.where(df[DEPARTMENT_COLUMN].isin(EMPLOYEE_RESTAURANTS), EMPLOYEE_GROUP, OTHER_GROUP),
+        index=df.index,
+        name="group",
+    )
+
+    # 一次分组得到每个 (品类, 分组) 的行位置，再对各组求和
+    # 与逐组筛选后求和的结果逐位一致
+    positions = df.groupby([df[classification_column], group], sort=False).indices
+    untaxed_values = df[UNTAXED_COLUMN]
+    tax_values = df[TAX_COLUMN]
+
+    totals = {}
+    for (category, group_name), rows in positions.items():
+        if exact:
+            totals[(category, group_name)] = (math.fsum(untaxed_values.iloc[rows].fillna(0).tolist()),
+                                              math.fsum(tax_values.iloc[rows].fillna(0).tolist()), len(rows))
+        else:
+            totals[(category, group_name)] = (untaxed_values.iloc[rows].sum(), tax_values.iloc[rows].sum(), len(rows))
+
+    group_rows = group.value_counts().reindex([EMPLOYEE_GROUP, OTHER_GROUP], fill_value=0)
+    return _build_table(categories, totals), group_rows
+
+
+def _build_table(categories, totals):
+    """由 {(品类, 分组): (不含税金额, 税费, 数量)} 生成品类汇总表，没有数据的品类为0"""
+    columns = pd.MultiIndex.from_product([[EMPLOYEE_GROUP, OTHER_GROUP], [UNTAXED, TAX, COUNT]])
+    # 使用object类型保存原始求和结果
+    table = pd.DataFrame(0, index=pd.Index(categories), columns=columns, dtype=object)
+    for (category, group_name), (untaxed, tax, count) in totals.items():
+        if category not in table.index:
+            continue
+        table.at[category, (group_name, UNTAXED)] = untaxed
+        table.at[category, (group_name, TAX)] = tax
+        table.at[category, (group_name, COUNT)] = count
+    return table
+
+
+class CategoryAccumulator:
+    """逐行累计各品类在员餐/非员餐下的金额和数量，用于流式处理时不保留明细数据"""
+
+    def __init__(self, categories=ORDERED_CATEGORIES):
+        self.categories = list(categories)
+        # {(品类, 分组): [不含税金额部分和列表, 税费部分和列表, 数量]}
+        self.totals = {}
+        self.group_rows = {EMPLOYEE_GROUP: 0, OTHER_GROUP: 0}
+
+    def add(self, category, department, untaxed, tax):
+        """累计一行数据，金额为空或不是数字时按0处理"""
+        group_name = EMPLOYEE_GROUP if department in EMPLOYEE_RESTAURANTS else OTHER_GROUP
+        self.group_rows[group_name] += 1
+        entry = self.totals.get((category, group_name))
+        if entry is None:
+            entry = self.totals[(category, group_name)] = [[], [], 0]
+        _add_exact(entry[0], _number_or_zero(untaxed))
+        _add_exact(entry[1], _number_or_zero(tax))
+        entry[2] += 1
+
+    def add_empty_rows(self, count):
+        """累计空行（只计入非员餐的总行数）"""
+        self.group_rows[OTHER_GROUP] += count
+
+    def result(self):
+        """返回与 summarize_by_category 相同结构的 (table, group_rows)"""
+        totals = {
+            key: (math.fsum(untaxed), math.fsum(tax), count)
+            for key, (untaxed, tax, count) in self.totals.items()
+        }
+        group_rows = pd.Series(self.group_rows).reindex([EMPLOYEE_GROUP, OTHER_GROUP])
+        return _build_table(self.categories, totals), group_rows
+
+
+def _add_exact(partials, value):
+    """
+    将value无误差地累加到部分和列表中（Shewchuk算法，与math.fsum相同）
+
+    逐行累加大量金额时浮点误差会不断累积，使用部分和可以得到正确舍入的合计
+    """
+    i = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+def _number_or_zero(value):
+    """数字原样返回，空值、NaN和非数字返回0"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return 0
+    return value
@@ -0,0 +1,155 @@
+import os
+import warnings
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE, Cell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+# 忽略来自openpyxl.styles.stylesheet的UserWarning
+warnings.filterwarnings("ignore", category=UserWarning, module='openpyxl.styles.stylesheet')
+
+# 对账单表头所在行（Excel行号）
+HEADER_ROW = 6
+
+# 旧版Excel文件（BIFF格式），由xlrd读取后转换为openpyxl工作簿，处理结果保存为.xlsx
+XLS_EXTENSION = ".xls"
+
+
+def is_xls(file_path):
+    """是否为旧版.xls文件"""
+    return os.path.splitext(file_path)[1].lower() == XLS_EXTENSION
+
+
+def read_xls_book(file_path):
+    """用xlrd读取.xls文件（含格式信息），返回xlrd.Book"""
+    import xlrd
+
+    return xlrd.open_workbook(file_path, formatting_info=True)
+
+
+def xls_to_workbook(book):
+    """
+    将xlrd读取的.xls工作簿转换为内存中的openpyxl工作簿，之后与.xlsx文件同样处理和保存
+
+    转换所有工作表的单元格值（日期转换为datetime，公式使用文件中保存的计算结果）、
+    数字格式、粗体、合并单元格和列宽，其他格式不保留。
+    与openpyxl读取文件时相同，直接创建单元格并设置值和类型，不逐个检查。
+    """
+    import xlrd
+
+    data_types = {
+        xlrd.XL_CELL_TEXT: "s",
+        xlrd.XL_CELL_NUMBER: "n",
+        xlrd.XL_CELL_DATE: "d",
+        xlrd.XL_CELL_BOOLEAN: "b",
+        xlrd.XL_CELL_ERROR: "e",
+    }
+    wb = Workbook()
+    wb.remove(wb.active)
+    bold_font = Font(bold=True)
+    for sheet in book.sheets():
+        ws = wb.create_sheet(sheet.name)
+        cells = ws._cells
+        # {xf序号: 样式}，同一格式的单元格共用一次转换的结果，没有数字格式和粗体时为None
+        styles = {}
+        for row in range(sheet.nrows):
+            for column, (cell_type, value) in enumerate(zip(sheet.row_types(row), sheet.row_values(row))):
+                data_type = data_types.get(cell_type)
+                if data_type is None:
+                    # 空单元格
+                    continue
+                if data_type == "s":
+                    if ILLEGAL_CHARACTERS_RE.search(value):
+                        value = ILLEGAL_CHARACTERS_RE.sub("", value)
+                elif data_type == "d":
+                    value = xlrd.xldate_as_datetime(value, book.datemode)
+                elif data_type == "b":
+                    value = bool(value)
+                elif data_type == "e":
+                    value = xlrd.error_text_from_code.get(value)
+
+                xf_index = sheet.cell_xf_index(row, column)
+                if xf_index not in styles:
+                    styles[xf_index] = _xls_style(ws, book, xf_index, bold_font)
+                cell = Cell(ws, row=row + 1, column=column + 1, style_array=styles[xf_index])
+                cell._value = value
+                cell.data_type = data_type
+                cells[(row + 1, column + 1)] = cell
+        if cells:
+            ws._current_row = ws.max_row
+
+        for row_low, row_high, column_low, column_high in sheet.merged_cells:
+            ws.merge_cells(start_row=row_low + 1, start_column=column_low + 1, end_row=row_high, end_column=column_high)
+        for column, info in sheet.colinfo_map.items():
+            ws.column_dimensions[get_column_letter(column + 1)].width = info.width / 256
+    return wb
+
+
+def _xls_style(ws, book, xf_index, bold_font):
+    """.xls中xf格式对应的openpyxl样式（只转换数字格式和粗体），都是默认值时返回None"""
+    xf = book.xf_list[xf_index]
+    format_info = book.format_map.get(xf.format_key)
+    number_format = format_info.format_str if format_info else "General"
+    bold = book.font_list[xf.font_index].bold
+    if number_format == "General" and not bold:
+        return None
+    cell = Cell(ws)
+    cell.number_format = number_format
+    if bold:
+        cell.font = bold_font
+    return cell._style
+
+
+def load_xls_workbook(file_path):
+    """读取.xls文件并转换为openpyxl工作簿（见xls_to_workbook）"""
+    return xls_to_workbook(read_xls_book(file_path))
+
+
+def load_statement(file_path, header_row=HEADER_ROW):
+    """
+    只解析一次Excel文件，同时返回表格数据(DataFrame)和可写入的工作簿
+
+    DataFrame直接由已加载的openpyxl工作簿生成，不再重复解析文件；.xls文件由xlrd读取一次，
+    同时生成DataFrame和转换后的openpyxl工作簿。
+    返回 (df, wb)；无法转换为openpyxl工作簿的文件返回的wb为None。
+    """
+    if is_xls(file_path):
+        try:
+            book = read_xls_book(file_path)
+        except Exception:
+            # 扩展名为.xls但不是旧版Excel格式（如另存时改了扩展名），按下面的方式读取
+            pass
+        else:
+            # 表格数据由pandas直接从已读取的xlrd工作簿生成，与按值读取.xls文件的结果相同
+            return pd.read_excel(book, header=header_row - 1, engine="xlrd"), xls_to_workbook(book)
+
+    try:
+        wb = load_workbook(file_path)
+    except Exception:
+        # openpyxl无法打开的格式，只读取表格数据，由调用方决定如何保存
+        return pd.read_excel(file_path, header=header_row - 1), None
+
+    ws = wb.worksheets[0]
+    if any(cell.data_type == "f" for cell in ws._cells.values()):
+        # 含公式的工作表需要使用Excel缓存的计算结果，只能按值重新读取
+        df = pd.read_excel(file_path, header=header_row - 1)
+    else:
+        df = pd.read_excel(wb, header=header_row - 1, engine="openpyxl")
+    return df, wb
+
+
+def write_column(ws, column, start_row, values):
+    """
+    从start_row开始将一整列数值批量写入工作表的第column列
+
+    直接操作工作表的单元格字典，避免逐个调用ws.cell()的查找和参数检查。
+    已存在的单元格只更新值，保留源文件原有的格式；空值不创建新单元格。
+    """
+    cells = ws._cells
+    for row, value in enumerate(values, start=start_row):
+        cell = cells.get((row, column))
+        if cell is not None:
+            cell.value = value
+        elif value is not None and value != "":
+            cells[(row, column)] = Cell(ws, row=row, column=column, value=value)
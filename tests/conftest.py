@@ -0,0 +1,35 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+# 测试数据使用基准测试的合成数据（benchmarks/fixtures.py）
+sys.path.insert(0, os.path.join(REPO_DIR, "benchmarks"))
+
+from fixtures import ensure_fixture  # noqa: E402
+
+STATEMENT_ROWS = 300
+
+
+@pytest.fixture(scope="session")
+def fixture_dir(tmp_path_factory):
+    """本次测试生成的合成数据目录，同样的参数只生成一次"""
+    return str(tmp_path_factory.mktemp("fixtures"))
+
+
+@pytest.fixture
+def make_fixture(fixture_dir, tmp_path):
+    """生成合成数据并复制到测试的临时目录（处理结果保存在对账单所在的文件夹中），返回复制后的路径"""
+    def make(kind, size, seed=0, name=None):
+        path = ensure_fixture(fixture_dir, kind, size, seed, log=lambda message: None)
+        return shutil.copy(path, os.path.join(tmp_path, name or os.path.basename(path)))
+    return make
+
+
+@pytest.fixture
+def statement(make_fixture):
+    """合成的.xlsx对账单"""
+    return make_fixture("statement", STATEMENT_ROWS)
@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+
+from fixtures import M_VALUES
+from srct_classifier import (CONTAINS, DEFAULT_LABEL, DEFAULT_RULES, EXACT, ClassificationCache, RuleSet,
+                             classify_series, get_rules_path, load_rules)
+
+
+def legacy_classify(m_value):
+    """原来逐行判断的分类规则，作为分类结果的基准"""
+    m_value = str(m_value) if pd.notna(m_value) else ""
+    if not m_value:
+        return ""
+    if any(keyword in m_value for keyword in ["鱼虾蟹干及瑶柱干", "海参鲍鱼鱼翅干及肚干", "其他水产干货"]) or "燕窝" in m_value:
+        return "干货"
+    elif "活鲜" in m_value:
+        return "海鲜"
+    elif "酒" in m_value:
+        return "酒类"
+    elif "饮料" in m_value:
+        return "饮料"
+    elif m_value == "水":
+        return "水"
+    else:
+        return "其他"
+
+
+# 同时包含多个品类关键词、与"等于"规则相近的取值，以及非字符串和空值
+TRICKY_VALUES = M_VALUES + [
+    "燕窝饮料", "活鲜酒", "酒水饮料", "饮料水", "其他水产干货活鲜", "啤酒活鲜", "水 ", " 水", "水水",
+    "矿泉水", "海参鲍鱼鱼翅干", "鱼虾蟹干及瑶柱干酒", "酒", "饮", "", None, float("nan"), 123, 4.5,
+]
+
+
+@pytest.fixture(params=["default", "rules_file"])
+def rule_set(request):
+    """内置规则和程序目录下rules.txt中的规则，两者都应与原来的判断一致"""
+    if request.param == "default":
+        return RuleSet(DEFAULT_RULES)
+    return load_rules(get_rules_path())
+
+
+@pytest.mark.parametrize("m_value", TRICKY_VALUES)
+def test_classify_matches_legacy(rule_set, m_value):
+    cache = ClassificationCache(rule_set)
+    assert cache.classify(m_value) == legacy_classify(m_value)
+
+
+def test_classify_series_matches_legacy(rule_set):
+    values = pd.Series(TRICKY_VALUES * 3, dtype=object)
+    labels = classify_series(values, cache=ClassificationCache(rule_set))
+    assert labels.tolist() == [legacy_classify(value) for value in values]
+
+
+def test_priority_and_rule_order():
+    """优先级数字小的规则优先，同一优先级按规则表中的先后顺序，"等于"规则与"包含"规则按同样的顺序比较"""
+    rule_set = RuleSet([
+        (2, CONTAINS, "果", "水果"),
+        (1, CONTAINS, "果汁", "饮料"),
+        (1, CONTAINS, "汁", "调料"),
+        (1, EXACT, "苹果", "水果"),
+        (3, EXACT, "果汁", "其他饮料"),
+    ])
+    assert rule_set.classify("鲜榨果汁") == "饮料"
+    assert rule_set.classify("番茄汁") == "调料"
+    assert rule_set.classify("苹果") == "水果"
+    assert rule_set.classify("苹果干") == "水果"
+    assert rule_set.classify("果汁") == "饮料"
+    assert rule_set.classify("蔬菜") == DEFAULT_LABEL
+    assert rule_set.classify("") == ""
+    assert rule_set.categories == ["饮料", "调料", "水果", "其他饮料", DEFAULT_LABEL]
+
+
+def test_exact_rule_needs_whole_value():
+    rule_set = RuleSet([(1, EXACT, "水", "水")])
+    assert rule_set.classify("水") == "水"
+    assert rule_set.classify("矿泉水") == DEFAULT_LABEL
+    assert rule_set.classify("水 ") == DEFAULT_LABEL
+
+
+def test_overlapping_keywords():
+    """关键词互相包含或重叠时，自动机也能找到所有匹配中优先级最高的"""
+    rule_set = RuleSet([
+        (3, CONTAINS, "abcd", "c"),
+        (2, CONTAINS, "bc", "b"),
+        (1, CONTAINS, "cde", "a"),
+    ])
+    assert rule_set.classify("abcde") == "a"
+    assert rule_set.classify("abcd") == "b"
+    assert rule_set.classify("xabcdx") == "b"
+    assert rule_set.classify("abce") == "b"
+
+
+def test_load_rules_errors(tmp_path):
+    path = tmp_path / "rules.txt"
+    path.write_text("# 注释\n1,包含,酒\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="第2行格式错误"):
+        load_rules(str(path))
+    path.write_text("一,包含,酒,酒类\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="优先级不是整数"):
+        load_rules(str(path))
+    path.write_text("1,开头,酒,酒类\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="匹配方式无效"):
+        load_rules(str(path))
+
+
+def test_cache_shared_between_series():
+    """每个不同的取值只分类一次，之后的对账单直接使用缓存"""
+    cache = ClassificationCache(RuleSet(DEFAULT_RULES))
+    values = pd.Series(["红酒", "红酒", "水", None])
+    classify_series(values, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert classify_series(values, cache=cache).tolist() == ["酒类", "酒类", "水", ""]
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert cache.labels == {"红酒": "酒类", "水": "水"}
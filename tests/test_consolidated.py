@@ -0,0 +1,36 @@
+import os
+
+import openpyxl
+
+from srct_consolidated import is_consolidated_workbook, write_consolidated_workbook
+from srct_pipeline import find_statement_files, process_statement
+
+
+def quiet(message):
+    pass
+
+
+def test_consolidated_workbook_totals(make_fixture):
+    """同一供应商的多个对账单合并为一行，合计行为所有供应商的合计"""
+    first = process_statement(make_fixture("statement", 100, seed=0), log=quiet)
+    second = process_statement(make_fixture("statement", 100, seed=0, name="copy.xlsx"), log=quiet)
+    output_file = os.path.join(os.path.dirname(first["file"]), "汇总.xlsx")
+    assert write_consolidated_workbook([first, second], output_file, log=quiet) == 1
+
+    ws = openpyxl.load_workbook(output_file).active
+    rows = [[cell.value for cell in row] for row in ws.iter_rows(min_row=5)]
+    assert [row[0] for row in rows] == [first["supplier"], "合计"]
+    assert rows[0][-1] == rows[1][-1]
+    assert abs(rows[0][-1] - 2 * first["total"]) < 1e-6
+
+
+def test_folder_run_skips_consolidated_workbook_with_any_name(statement):
+    """命令行指定其他文件名保存在对账单文件夹中的汇总表，再次按文件夹处理时不会被当作对账单"""
+    folder = os.path.dirname(statement)
+    result = process_statement(statement, log=quiet)
+    output_file = os.path.join(folder, "cons.xlsx")
+    write_consolidated_workbook([result], output_file, log=quiet)
+
+    assert is_consolidated_workbook(output_file)
+    assert not is_consolidated_workbook(statement)
+    assert find_statement_files(folder) == [statement]
@@ -0,0 +1,152 @@
+import json
+import os
+
+from SRCT import run_cli
+from srct_classifier import ClassificationCache
+from srct_manifest import MANIFEST_FILE, IncrementalBuild, processing_mode
+from srct_pipeline import process_batch
+
+MODE = processing_mode()
+
+
+def quiet(message):
+    pass
+
+
+def process(statement, build=None):
+    """处理一次对账单并保存处理记录，返回 (分类规则版本, 处理结果)"""
+    cache = ClassificationCache()
+    if build is None:
+        build = IncrementalBuild(cache.rule_set.version, MODE, log=quiet)
+    [result] = process_batch([statement], cache=cache, build=build, log=quiet)
+    build.save()
+    return cache.rule_set.version, result
+
+
+def up_to_date(statement, rules_version, mode=MODE, force=False):
+    return IncrementalBuild(rules_version, mode, force=force, log=quiet).up_to_date(statement)
+
+
+def test_unchanged_file_is_skipped(statement):
+    rules_version, result = process(statement)
+    assert result["success"] and not result["skipped"]
+    assert os.path.exists(os.path.join(os.path.dirname(statement), MANIFEST_FILE))
+
+    recorded = up_to_date(statement, rules_version)
+    assert recorded is not None and recorded["skipped"] and recorded["success"]
+    for key in ("output_file", "rows", "untaxed", "tax", "total", "supplier", "categories"):
+        assert recorded[key] == result[key]
+
+
+def test_skipped_in_batch(statement):
+    process(statement)
+    _, result = process(statement)
+    assert result["skipped"]
+
+
+def test_touched_file_with_same_content_is_skipped(statement):
+    rules_version, _ = process(statement)
+    os.utime(statement, (1, 1))
+    assert up_to_date(statement, rules_version) is not None
+
+
+def test_changed_content_is_reprocessed(statement, make_fixture):
+    rules_version, _ = process(statement)
+    # 另一份内容不同的对账单覆盖原文件
+    make_fixture("statement", 50, seed=1, name=os.path.basename(statement))
+    assert up_to_date(statement, rules_version) is None
+
+
+def test_changed_rules_are_reprocessed(statement):
+    rules_version, _ = process(statement)
+    assert up_to_date(statement, "other-rules") is None
+
+
+def test_changed_config_is_reprocessed(statement):
+    rules_version, _ = process(statement)
+    # 对账单所在文件夹中新增config.txt，之后再修改其中的酒店名称
+    config_path = os.path.join(os.path.dirname(statement), "config.txt")
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write("B2:测试酒店\n")
+    assert up_to_date(statement, rules_version) is None
+
+    process(statement)
+    assert up_to_date(statement, rules_version) is not None
+    with open(config_path, "w", encoding="utf-8") as f:
+        f.write("B2:另一家酒店\n")
+    os.utime(config_path, (2, 2))
+    assert up_to_date(statement, rules_version) is None
+
+
+def test_changed_mode_missing_output_and_force(statement):
+    rules_version, result = process(statement)
+    assert up_to_date(statement, rules_version, mode=processing_mode(streaming=True)) is None
+    assert up_to_date(statement, rules_version, force=True) is None
+    os.remove(result["output_file"])
+    assert up_to_date(statement, rules_version) is None
+
+
+def test_failed_file_is_not_recorded(tmp_path):
+    path = str(tmp_path / "broken.xlsx")
+    with open(path, "wb") as f:
+        f.write(b"not a workbook")
+    rules_version, result = process(path)
+    assert not result["success"]
+    assert up_to_date(path, rules_version) is None
+
+
+def test_cli_summary_counts_skipped_files_once(statement, tmp_path):
+    """命令行处理结果中跳过的文件不计入成功处理的文件，成功、跳过和失败的数量之和为总文件数"""
+    summary_file = str(tmp_path / "summary.json")
+    args = [os.path.dirname(statement), "--workers", "1", "--summary", summary_file]
+    assert run_cli(args) == 0
+    assert run_cli(args) == 0
+    with open(summary_file, encoding="utf-8") as f:
+        summary = json.load(f)
+    counts = [summary[key] for key in ("successful_files", "skipped_files", "failed_files")]
+    assert counts == [0, 1, 0]
+    assert sum(counts) == summary["total_files"]
+
+
+def test_profile_and_missing_sidecar_are_reprocessed(statement):
+    """需要性能记录或还没有解析缓存时不跳过，否则性能记录和解析缓存中会缺少这些文件"""
+    rules_version, _ = process(statement)
+    build = IncrementalBuild(rules_version, MODE, log=quiet, profile=True)
+    assert build.up_to_date(statement) is None
+    build = IncrementalBuild(rules_version, MODE, log=quiet, sidecar=True)
+    assert build.up_to_date(statement) is None
+
+    cache = ClassificationCache()
+    [result] = process_batch([statement], cache=cache, build=build, log=quiet, sidecar=True)
+    build.save()
+    assert result["success"] and not result["skipped"]
+    assert build.up_to_date(statement) is not None
+
+
+def test_cli_profile_rerun_writes_trace(statement, tmp_path):
+    trace_file = str(tmp_path / "trace.csv")
+    args = [os.path.dirname(statement), "--workers", "1"]
+    assert run_cli(args) == 0
+    assert run_cli(args + ["--profile", trace_file]) == 0
+    with open(trace_file, encoding="utf-8") as f:
+        assert os.path.basename(statement) in f.read()
+
+
+def test_failed_file_without_record_does_not_write_manifest(tmp_path):
+    """没有记录的文件处理失败时不需要保存处理记录，文件夹不存在时也不会警告"""
+    messages = []
+    build = IncrementalBuild("rules", MODE, log=messages.append)
+    path = str(tmp_path / "missing" / "statement.xlsx")
+    build.record({"file": path, "success": False, "skipped": False})
+    build.save()
+    assert not build.changed and not messages
+    assert not os.path.exists(os.path.dirname(path))
+
+
+def test_failed_file_removes_previous_record(statement):
+    rules_version, result = process(statement)
+    build = IncrementalBuild(rules_version, MODE, log=quiet)
+    build.record({**result, "success": False})
+    assert build.changed
+    build.save()
+    assert up_to_date(statement, rules_version) is None
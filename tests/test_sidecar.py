@@ -0,0 +1,74 @@
+import os
+
+import openpyxl
+import pytest
+
+from srct_classifier import ClassificationCache
+from srct_pipeline import process_statement
+from srct_sidecar import load_sidecar, sidecar_path
+from srct_streaming import stream_statement
+
+pytest.importorskip("pyarrow")
+
+RESULT_KEYS = ["rows", "untaxed", "tax", "total", "supplier", "categories"]
+
+
+def quiet(message):
+    pass
+
+
+def sheet_values(path):
+    return [[[cell.value for cell in row] for row in ws.iter_rows()] for ws in openpyxl.load_workbook(path)]
+
+
+@pytest.mark.parametrize("kind", ["statement", "xls"])
+@pytest.mark.parametrize("first_streaming", [True, False])
+def test_streaming_from_sidecar_matches_streaming(make_fixture, kind, first_streaming):
+    """解析结果缓存由流式处理或正常处理保存，之后流式处理读取缓存，确认函和结果与直接流式读取一致"""
+    if kind == "xls":
+        pytest.importorskip("xlwt")
+    path = make_fixture(kind, 300)
+    expected = process_statement(path, streaming=True, log=quiet)
+    expected_sheets = sheet_values(expected["output_file"])
+
+    process_statement(path, streaming=first_streaming, log=quiet, sidecar=True)
+    assert os.path.exists(sidecar_path(path))
+
+    logs = []
+    result = process_statement(path, streaming=True, log=logs.append, sidecar=True)
+    assert "对账单未变化，使用解析结果缓存..." in logs
+    assert {key: result[key] for key in RESULT_KEYS} == {key: expected[key] for key in RESULT_KEYS}
+    assert sheet_values(result["output_file"]) == expected_sheets
+
+
+def test_sidecar_invalidated_by_content_change(statement, make_fixture):
+    process_statement(statement, streaming=True, log=quiet, sidecar=True)
+    os.utime(statement, (1, 1))
+    assert load_sidecar(statement, quiet) is not None
+    make_fixture("statement", 50, seed=1, name=os.path.basename(statement))
+    assert load_sidecar(statement, quiet) is None
+
+
+def test_sidecar_reclassifies_when_rules_change(statement):
+    """规则版本与缓存不一致时用缓存中的M列重新分类，结果与流式读取一致"""
+    process_statement(statement, streaming=True, log=quiet, sidecar=True)
+    sidecar = load_sidecar(statement, quiet)
+    sidecar.metadata["rules"] = "other-rules"
+    cache = ClassificationCache()
+    summary, group_rows, rows, source_wb = sidecar.summarize(cache)
+    assert cache.misses > 0
+
+    expected, expected_group_rows, expected_rows, stream_wb = stream_statement(statement, ClassificationCache(), quiet)
+    stream_wb.close()
+    assert summary.equals(expected)
+    assert group_rows.tolist() == expected_group_rows.tolist()
+    assert rows == expected_rows
+
+
+def test_corrupt_sidecar_is_ignored(statement):
+    process_statement(statement, streaming=True, log=quiet, sidecar=True)
+    with open(sidecar_path(statement), "wb") as f:
+        f.write(b"broken")
+    logs = []
+    assert load_sidecar(statement, logs.append) is None
+    assert logs and logs[0].startswith("警告：读取解析缓存失败")
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+import pytest
+
+from fixtures import receipt_pages, write_receipt_pdf
+from split_pdf_batch import EXTRACT_CHUNK_PAGES, segment_pdf, split_pdfs, split_receipts
+from split_pdf_cache import PARSER_VERSION, PageTextCache, file_hash
+from split_pdf_header import parse_page_header
+from split_pdf_registry import ReceiptRegistry
+
+PAGES = 40
+
+
+def expected_receipts(pages, seed=0, start=1):
+    """按生成时的页面文本得到 [(供应商, 收货单号, 收货日期, [页码])]"""
+    receipts = {}
+    for page_num, lines in enumerate(receipt_pages(pages, seed, start)):
+        receipt, vendor, rev_date = parse_page_header("\n".join(lines))
+        receipts.setdefault(receipt, (vendor, receipt, rev_date, []))[3].append(page_num)
+    return list(receipts.values())
+
+
+def output_files(output_dir):
+    """输出目录中的收货单文件 {收货单号: 路径}"""
+    files = {}
+    for folder, _, names in os.walk(output_dir):
+        for name in names:
+            assert name.endswith(".pdf") and os.path.splitext(name)[0] not in files
+            files[os.path.splitext(name)[0]] = os.path.join(folder, name)
+    return files
+
+
+def quiet(message):
+    pass
+
+
+def test_receipt_keeps_its_own_date():
+    """被下一个收货单的首页结束的收货单使用自己的收货日期，而不是下一页的日期"""
+    page_infos = [
+        ("RF1", "供应商A", "2025-01-01"),
+        (None, None, None),
+        ("RF2", "供应商A", "2025-02-02"),
+        ("RF3", "供应商B", "2025-03-03"),
+    ]
+    assert split_receipts(page_infos) == [
+        ("供应商A", "RF1", "2025-01-01", [0, 1]),
+        ("供应商A", "RF2", "2025-02-02", [2]),
+        ("供应商B", "RF3", "2025-03-03", [3]),
+    ]
+
+
+def test_vendor_change_starts_new_receipt():
+    page_infos = [
+        (None, None, None),
+        ("RF1", None, "2025-01-01"),
+        (None, "供应商A", None),
+        (None, "供应商B", None),
+    ]
+    # 找到收货单号和供应商之前的页面不属于任何收货单；供应商变化时收货单号不变也拆分
+    assert split_receipts(page_infos) == [
+        ("供应商A", "RF1", None, [2]),
+        ("供应商B", "RF1", None, [3]),
+    ]
+
+
+def test_segment_pdf_boundaries_dates_and_vendors(make_fixture):
+    path = make_fixture("pdf", PAGES)
+    segment = segment_pdf(path)
+    assert segment["pages"] == PAGES
+    assert segment["extracted"] == PAGES
+    assert segment["errors"] == []
+    assert segment["receipts"] == expected_receipts(PAGES)
+    assert segment["vendors"] == {vendor for vendor, _, _, _ in expected_receipts(PAGES)}
+
+
+def test_parallel_extraction_matches_serial(make_fixture):
+    """多个进程按页面组并行提取时，拆分结果与在当前进程中逐页提取相同"""
+    pages = EXTRACT_CHUNK_PAGES * 2 + 20
+    path = make_fixture("pdf", pages)
+    serial = segment_pdf(path)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = segment_pdf(path, executor=executor)
+    assert parallel == serial
+    assert parallel["receipts"] == expected_receipts(pages)
+
+
+def test_page_cache_hit_gives_same_receipts(make_fixture, tmp_path):
+    """第二次读取同一文件时所有页面来自缓存，不再提取文本，拆分结果不变"""
+    path = make_fixture("pdf", PAGES)
+    cache_path = str(tmp_path / "page_cache.db")
+    first = segment_pdf(path, cache_path)
+    second = segment_pdf(path, cache_path)
+    assert first["extracted"] == PAGES
+    assert second["extracted"] == 0
+    assert second["receipts"] == first["receipts"] == expected_receipts(PAGES)
+    assert second["errors"] == []
+
+
+def test_old_parser_version_is_reparsed_from_cached_text(make_fixture, tmp_path):
+    """缓存中旧版本的解析结果从缓存的文本重新解析并写回缓存，不重新提取文本"""
+    path = make_fixture("pdf", PAGES)
+    cache_path = str(tmp_path / "page_cache.db")
+    segment_pdf(path, cache_path)
+    with sqlite3.connect(cache_path) as conn:
+        conn.execute("UPDATE pages SET receipt = NULL, vendor = NULL, rev_date = NULL, parser_version = 0")
+
+    segment = segment_pdf(path, cache_path)
+    assert segment["extracted"] == 0
+    assert segment["receipts"] == expected_receipts(PAGES)
+    with open(path, "rb") as f:
+        content_hash = file_hash(f.read())
+    cache = PageTextCache(cache_path)
+    try:
+        pages = cache.get_pages(content_hash)
+    finally:
+        cache.close()
+    assert {page[4] for page in pages.values()} == {PARSER_VERSION}
+
+
+def test_unusable_cache_falls_back_to_extraction(make_fixture, tmp_path):
+    path = make_fixture("pdf", PAGES)
+    # 缓存路径是一个目录，无法打开数据库
+    segment = segment_pdf(path, str(tmp_path))
+    assert segment["extracted"] == PAGES
+    assert segment["receipts"] == expected_receipts(PAGES)
+    assert len(segment["errors"]) == 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_split_pdfs_dedups_receipts_across_files(tmp_path, workers):
+    """
+    两个文件中收货单号重复时只保存先出现的文件中的收货单（与文件处理完成的先后无关），
+    登记库中已有的收货单号跳过，两个文件都归档
+    """
+    input_dir, output_dir, archive_dir = (str(tmp_path / name) for name in ("input", "output", "archive"))
+    os.makedirs(input_dir)
+    os.makedirs(archive_dir)
+    first, second = os.path.join(input_dir, "a.pdf"), os.path.join(input_dir, "b.pdf")
+    write_receipt_pdf(first, PAGES, seed=0)
+    # 第二个文件的收货单号从5开始，前面一部分与第一个文件重复
+    write_receipt_pdf(second, PAGES, seed=1, start=5)
+    first_receipts, second_receipts = expected_receipts(PAGES, 0), expected_receipts(PAGES, 1, start=5)
+    duplicates = {receipt for _, receipt, _, _ in first_receipts} & {receipt for _, receipt, _, _ in second_receipts}
+    assert duplicates
+
+    registry = ReceiptRegistry(str(tmp_path / "receipts.db"), legacy_file=None, log=quiet)
+    registered = first_receipts[0][1]
+    registry.conn.execute("INSERT INTO receipts (receipt) VALUES (?)", (registered,))
+    registry.conn.commit()
+    try:
+        stats = split_pdfs([first, second], output_dir, archive_dir, registry, workers=workers,
+                           log=quiet, log_error=quiet)
+        committed = registry.commit_journal()
+    finally:
+        registry.close()
+
+    expected = {receipt: (vendor, rev_date, len(page_nums)) for vendor, receipt, rev_date, page_nums in first_receipts}
+    for vendor, receipt, rev_date, page_nums in second_receipts:
+        expected.setdefault(receipt, (vendor, rev_date, len(page_nums)))
+    del expected[registered]
+
+    assert stats["failed_files"] == []
+    assert stats["new_receipts"] == set(expected)
+    assert stats["skipped_receipts"] == {registered} | duplicates
+    assert sorted(committed) == sorted(expected)
+    files = output_files(output_dir)
+    assert set(files) == set(expected)
+    for receipt, (vendor, rev_date, pages) in expected.items():
+        assert files[receipt] == os.path.join(output_dir, vendor, rev_date, f"{receipt}.pdf")
+        assert len(PyPDF2.PdfReader(files[receipt]).pages) == pages
+    assert os.listdir(input_dir) == []
+    assert sorted(os.listdir(archive_dir)) == ["a.pdf", "b.pdf"]
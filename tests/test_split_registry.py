@@ -0,0 +1,139 @@
+import os
+
+from split_pdf_batch import segment_pdf, split_pdfs
+from split_pdf_registry import QUERY_BATCH_SIZE, ReceiptJournal, ReceiptRegistry
+from split_pdf_writer import ReceiptPdfWriter
+
+# 中断前保存的收货单数
+SAVED_BEFORE_FAILURE = 3
+
+
+def quiet(message):
+    pass
+
+
+def open_registry(tmp_path, messages=None, legacy=True):
+    log = messages.append if messages is not None else quiet
+    legacy_file = str(tmp_path / "processed.txt") if legacy else None
+    return ReceiptRegistry(str(tmp_path / "receipts.db"), legacy_file=legacy_file, log=log)
+
+
+def saved_files(output_dir):
+    """输出目录中的收货单文件 {收货单号: 修改时间}，不应留下临时文件"""
+    files = {}
+    for folder, _, names in os.walk(output_dir):
+        for name in names:
+            assert name.endswith(".pdf")
+            files[os.path.splitext(name)[0]] = os.stat(os.path.join(folder, name)).st_mtime_ns
+    return files
+
+
+def test_legacy_file_is_imported_once(tmp_path):
+    """首次打开登记库时导入processed.txt（忽略空行和重复的收货单号），之后不再读取该文件"""
+    legacy_file = tmp_path / "processed.txt"
+    legacy_file.write_text("RFAH7970000001\n\n  RFAH7970000002 \nRFAH7970000001\n", encoding="utf-8")
+    messages = []
+    registry = open_registry(tmp_path, messages)
+    try:
+        assert len(registry) == 2
+        assert "RFAH7970000002" in registry and "RFAH7970000003" not in registry
+    finally:
+        registry.close()
+    assert len(messages) == 1
+
+    legacy_file.write_text("RFAH7970000003\n", encoding="utf-8")
+    messages.clear()
+    registry = open_registry(tmp_path, messages)
+    try:
+        assert len(registry) == 2 and "RFAH7970000003" not in registry
+    finally:
+        registry.close()
+    assert messages == []
+
+
+def test_missing_legacy_file(tmp_path):
+    registry = open_registry(tmp_path)
+    try:
+        assert len(registry) == 0
+    finally:
+        registry.close()
+
+
+def test_find_processed_in_batches(tmp_path):
+    """查询的收货单号超过一批时结果仍然完整，重复的收货单号只查询一次"""
+    registry = open_registry(tmp_path, legacy=False)
+    try:
+        processed = [f"RFAH7970{i:06d}" for i in range(0, QUERY_BATCH_SIZE * 3, 2)]
+        with registry.conn:
+            registry.conn.executemany("INSERT INTO receipts (receipt) VALUES (?)", ((r,) for r in processed))
+        queried = [f"RFAH7970{i:06d}" for i in range(QUERY_BATCH_SIZE * 3)] * 2
+        assert registry.find_processed(queried) == set(processed)
+        assert registry.find_processed([]) == set()
+    finally:
+        registry.close()
+
+
+def test_commit_journal_records_receipt_details(tmp_path):
+    registry = open_registry(tmp_path, legacy=False)
+    journal = ReceiptJournal(registry.path)
+    try:
+        journal.record(("RFAH7970000001", "供应商A", "2025-01-01", "out/RFAH7970000001.pdf", "a.pdf"))
+        assert "RFAH7970000001" not in registry
+        assert registry.commit_journal() == ["RFAH7970000001"]
+        row = registry.conn.execute(
+            "SELECT vendor, rev_date, output_path, source_pdf FROM receipts WHERE receipt = ?",
+            ("RFAH7970000001",)).fetchone()
+        assert row == ("供应商A", "2025-01-01", "out/RFAH7970000001.pdf", "a.pdf")
+        assert registry.commit_journal() == []
+    finally:
+        journal.close()
+        registry.close()
+
+
+def test_interrupted_run_resumes_without_writing_twice(tmp_path, make_fixture, monkeypatch):
+    """
+    保存收货单中途出错且未登记运行日志时，下次打开登记库登记已保存的收货单，
+    重新运行只保存剩余的收货单，已保存的文件不重新写入
+    """
+    pdf_path = make_fixture("pdf", 40)
+    output_dir, archive_dir = str(tmp_path / "output"), str(tmp_path / "archive")
+    os.makedirs(archive_dir)
+    total = len(segment_pdf(pdf_path)["receipts"])
+
+    render = ReceiptPdfWriter.render
+    calls = []
+
+    def failing_render(self, page_nums):
+        calls.append(page_nums)
+        if len(calls) > SAVED_BEFORE_FAILURE:
+            raise OSError("磁盘已满")
+        return render(self, page_nums)
+
+    monkeypatch.setattr(ReceiptPdfWriter, "render", failing_render)
+    registry = open_registry(tmp_path, legacy=False)
+    try:
+        stats = split_pdfs([pdf_path], output_dir, archive_dir, registry, log=quiet, log_error=quiet)
+    finally:
+        # 模拟中断：不调用commit_journal
+        registry.close()
+    assert stats["failed_files"] == [pdf_path] and os.path.exists(pdf_path)
+    saved = saved_files(output_dir)
+    assert len(saved) == SAVED_BEFORE_FAILURE
+    monkeypatch.setattr(ReceiptPdfWriter, "render", render)
+
+    messages = []
+    registry = open_registry(tmp_path, messages, legacy=False)
+    try:
+        assert len(registry) == SAVED_BEFORE_FAILURE and len(messages) == 1
+        stats = split_pdfs([pdf_path], output_dir, archive_dir, registry, log=quiet, log_error=quiet)
+        committed = registry.commit_journal()
+    finally:
+        registry.close()
+    assert stats["failed_files"] == []
+    assert stats["skipped_receipts"] == set(saved)
+    assert stats["output_files"] == len(committed) == total - SAVED_BEFORE_FAILURE
+    resumed = saved_files(output_dir)
+    assert len(resumed) == total
+    assert {receipt: resumed[receipt] for receipt in saved} == saved
+    assert os.listdir(archive_dir) == [os.path.basename(pdf_path)]
+
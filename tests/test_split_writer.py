@@ -0,0 +1,64 @@
+import io
+
+import PyPDF2
+import pytest
+
+from fixtures import receipt_pages
+from split_pdf_batch import segment_pdf
+from split_pdf_writer import ReceiptPdfWriter
+
+PAGES = 40
+
+
+@pytest.fixture
+def receipt_pdf(make_fixture):
+    """合成的多收货单PDF，返回 (路径, 文件内容, 收货单页码列表)"""
+    path = make_fixture("pdf", PAGES)
+    with open(path, "rb") as f:
+        data = f.read()
+    receipts = [page_nums for _, _, _, page_nums in segment_pdf(path)["receipts"]]
+    return path, data, receipts
+
+
+def page_texts(content, strict=False):
+    reader = PyPDF2.PdfReader(io.BytesIO(content), strict=strict)
+    return [page.extract_text() for page in reader.pages]
+
+
+def test_segment_pdf_finds_every_receipt(receipt_pdf):
+    """每个收货单的页面连续，与生成时的收货单号一一对应"""
+    path, data, receipts = receipt_pdf
+    expected = {}
+    for page_num, lines in enumerate(receipt_pages(PAGES)):
+        expected.setdefault(lines[1].split(": ")[1], []).append(page_num)
+    segments = segment_pdf(path)["receipts"]
+    assert [receipt for _, receipt, _, _ in segments] == list(expected)
+    assert [list(page_nums) for page_nums in receipts] == list(expected.values())
+
+
+def test_copied_receipts_match_pdf_writer(receipt_pdf):
+    """按原样复制对象生成的收货单与PyPDF2.PdfWriter生成的页数和页面文本一致，并能按严格模式读取"""
+    path, data, receipts = receipt_pdf
+    writer = ReceiptPdfWriter(data)
+    for page_nums in receipts:
+        copied = writer.render(page_nums)
+        assert page_texts(copied, strict=True) == page_texts(writer.render_with_pypdf2(page_nums))
+    assert writer.fallbacks == 0
+
+
+def test_copied_receipts_match_source_pages(receipt_pdf):
+    path, data, receipts = receipt_pdf
+    source = PyPDF2.PdfReader(io.BytesIO(data))
+    writer = ReceiptPdfWriter(data)
+    for page_nums in receipts:
+        assert page_texts(writer.render(page_nums)) == [source.pages[page_num].extract_text() for page_num in page_nums]
+
+
+def test_falls_back_to_pdf_writer_for_unsupported_source(receipt_pdf):
+    """源文件不能按原样复制时改用PdfWriter生成，内容仍然一致"""
+    path, data, receipts = receipt_pdf
+    writer = ReceiptPdfWriter(data)
+    writer.strict_reader = None
+    page_nums = receipts[0]
+    assert page_texts(writer.render(page_nums)) == page_texts(writer.render_with_pypdf2(page_nums))
+    assert writer.fallbacks == 1
@@ -0,0 +1,85 @@
+import openpyxl
+import pytest
+
+from srct_classifier import ClassificationCache, classify_series
+from srct_pipeline import CLASSIFICATION_COLUMN, process_statement
+from srct_streaming import stream_statement
+from srct_summary import COUNT, summarize_by_category
+from srct_workbook import load_statement
+
+
+def normal_summary(path, exact=False):
+    """按整个工作表读取后汇总（非流式处理的方式）"""
+    df, wb = load_statement(path)
+    cache = ClassificationCache()
+    df.insert(13, CLASSIFICATION_COLUMN, classify_series(df[df.columns[12]], cache=cache))
+    return summarize_by_category(df, CLASSIFICATION_COLUMN, cache.rule_set.categories, exact=exact)
+
+
+def streamed_summary(path):
+    summary, group_rows, rows, source_wb = stream_statement(path, ClassificationCache(), log=lambda message: None)
+    source_wb.close()
+    return summary, group_rows, rows
+
+
+def assert_same_summary(actual, expected):
+    """数量完全一致，金额在浮点误差范围内一致"""
+    assert actual.index.tolist() == expected.index.tolist()
+    assert actual.columns.tolist() == expected.columns.tolist()
+    for category in expected.index:
+        for column in expected.columns:
+            if column[1] == COUNT:
+                assert actual.at[category, column] == expected.at[category, column]
+            else:
+                assert actual.at[category, column] == pytest.approx(expected.at[category, column], rel=1e-12)
+
+
+def insert_empty_rows(path):
+    """在明细中间插入空行，并在末尾留下空行的格式（流式读取时末尾空行不计入）"""
+    wb = openpyxl.load_workbook(path)
+    ws = wb.active
+    ws.insert_rows(20, 3)
+    ws.cell(row=ws.max_row + 5, column=1).number_format = "0.00"
+    wb.save(path)
+
+
+def test_streaming_summary_matches_normal(statement):
+    summary, group_rows, rows = streamed_summary(statement)
+    expected, expected_group_rows = normal_summary(statement)
+    assert_same_summary(summary, expected)
+    assert group_rows.tolist() == expected_group_rows.tolist()
+
+
+def test_streaming_summary_matches_exact_summary(statement):
+    """exact=True 时与流式处理的合计逐位一致"""
+    summary, group_rows, rows = streamed_summary(statement)
+    expected, expected_group_rows = normal_summary(statement, exact=True)
+    assert summary.equals(expected)
+    assert group_rows.tolist() == expected_group_rows.tolist()
+
+
+def test_streaming_counts_middle_empty_rows(statement):
+    insert_empty_rows(statement)
+    summary, group_rows, rows = streamed_summary(statement)
+    df, wb = load_statement(statement)
+    assert rows == len(df)
+    expected, expected_group_rows = normal_summary(statement)
+    assert_same_summary(summary, expected)
+    assert group_rows.tolist() == expected_group_rows.tolist()
+
+
+def test_streaming_result_matches_normal(statement):
+    quiet = lambda message: None
+    streamed = process_statement(statement, streaming=True, log=quiet)
+    normal = process_statement(statement, log=quiet)
+    assert streamed["success"] and normal["success"]
+    assert streamed["output_file"].endswith("_确认函.xlsx")
+    assert normal["output_file"].endswith("_分类.xlsx")
+    assert (streamed["rows"], streamed["supplier"]) == (normal["rows"], normal["supplier"])
+    for key in ("untaxed", "tax", "total"):
+        assert streamed[key] == pytest.approx(normal[key], rel=1e-12)
+    assert streamed["categories"].keys() == normal["categories"].keys()
+    for category, groups in normal["categories"].items():
+        for group_name, values in groups.items():
+            for metric, value in values.items():
+                assert streamed["categories"][category][group_name][metric] == pytest.approx(value, rel=1e-12)
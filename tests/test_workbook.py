@@ -0,0 +1,92 @@
+import datetime
+import os
+
+import openpyxl
+import pytest
+
+from srct_pipeline import process_statement
+from srct_workbook import load_statement, read_xls_book, xls_to_workbook
+
+xlrd = pytest.importorskip("xlrd")
+
+
+@pytest.fixture
+def xls_file(tmp_path):
+    """含各种单元格类型、数字格式、粗体、合并单元格和列宽的.xls文件"""
+    xlwt = pytest.importorskip("xlwt")
+    book = xlwt.Workbook(encoding="utf-8")
+    ws = book.add_sheet("Statement Sheet")
+    bold = xlwt.easyxf("font: bold on")
+    amount = xlwt.easyxf(num_format_str="#,##0.00")
+    date = xlwt.easyxf(num_format_str="yyyy-mm-dd")
+    ws.write_merge(0, 0, 0, 3, "2025-06 供应商对账单", bold)
+    ws.write(1, 0, "文本")
+    ws.write(1, 1, 1234.5, amount)
+    ws.write(1, 2, 42)
+    ws.write(1, 3, datetime.datetime(2025, 6, 30), date)
+    ws.write(1, 4, True)
+    ws.write(1, 5, "含\x07控制字符")
+    ws.col(1).width = 256 * 20
+    book.add_sheet("第二页").write(0, 0, "其他工作表")
+    path = str(tmp_path / "cells.xls")
+    book.save(path)
+    return path
+
+
+def test_xls_values_formats_and_merges(xls_file, tmp_path):
+    wb = xls_to_workbook(read_xls_book(xls_file))
+    assert wb.sheetnames == ["Statement Sheet", "第二页"]
+    ws = wb["Statement Sheet"]
+
+    assert ws["A1"].value == "2025-06 供应商对账单"
+    assert ws["A1"].font.bold
+    assert [str(merged) for merged in ws.merged_cells.ranges] == ["A1:D1"]
+    assert ws["A2"].value == "文本" and not ws["A2"].font.bold
+    assert ws["B2"].value == 1234.5 and ws["B2"].number_format == "#,##0.00"
+    assert ws["C2"].value == 42 and ws["C2"].number_format == "General"
+    assert ws["D2"].value == datetime.datetime(2025, 6, 30) and ws["D2"].number_format == "yyyy-mm-dd"
+    assert ws["E2"].value is True
+    assert ws["F2"].value == "含控制字符"
+    assert ws.column_dimensions["B"].width == 20
+    assert wb["第二页"]["A1"].value == "其他工作表"
+
+    # 转换后的工作簿可以保存为.xlsx，重新打开后内容不变
+    path = str(tmp_path / "cells.xlsx")
+    wb.save(path)
+    saved = openpyxl.load_workbook(path)["Statement Sheet"]
+    assert [[cell.value for cell in row] for row in saved.iter_rows(max_row=2)] == \
+        [[cell.value for cell in row] for row in ws.iter_rows(max_row=2)]
+    assert saved["B2"].number_format == "#,##0.00"
+    assert [str(merged) for merged in saved.merged_cells.ranges] == ["A1:D1"]
+
+
+def test_xls_statement_reads_like_xlsx(make_fixture):
+    """内容相同的.xls和.xlsx对账单读取得到相同的表格数据"""
+    xls_path = make_fixture("xls", 200)
+    xlsx_path = make_fixture("statement", 200)
+    xls_df, xls_wb = load_statement(xls_path)
+    xlsx_df, xlsx_wb = load_statement(xlsx_path)
+    assert xls_wb is not None
+    assert xls_df.columns.tolist() == xlsx_df.columns.tolist()
+    assert xls_df.astype(object).where(xls_df.notna(), None).values.tolist() == \
+        xlsx_df.astype(object).where(xlsx_df.notna(), None).values.tolist()
+
+
+def test_xls_statement_output_matches_xlsx(make_fixture):
+    """.xls对账单另存为_分类.xlsx，明细、品类标记和确认函与.xlsx对账单的处理结果一致"""
+    quiet = lambda message: None
+    xls_path = make_fixture("xls", 200, name="2025-06_供应商.xls")
+    xlsx_path = make_fixture("statement", 200, name="2025-06_供应商.xlsx")
+    xls_result = process_statement(xls_path, edit_in_place=True, log=quiet)
+    xlsx_result = process_statement(xlsx_path, log=quiet)
+    assert xls_result["success"] and xlsx_result["success"]
+    assert os.path.basename(xls_result["output_file"]) == "2025-06_供应商_分类.xlsx"
+    assert os.path.exists(xls_path)
+
+    xls_wb = openpyxl.load_workbook(xls_result["output_file"])
+    xlsx_wb = openpyxl.load_workbook(xlsx_result["output_file"])
+    assert xls_wb.sheetnames == xlsx_wb.sheetnames
+    for name in xlsx_wb.sheetnames:
+        assert [[cell.value for cell in row] for row in xls_wb[name].iter_rows()] == \
+            [[cell.value for cell in row] for row in xlsx_wb[name].iter_rows()]
+